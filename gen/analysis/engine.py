@@ -0,0 +1,253 @@
+"""
+First-match access control policy evaluation engines
+
+LinearClassifier scans the rules in order and serves as correctness oracle and
+benchmark baseline. CompiledClassifier is a bit-vector classifier: every
+dimension (source/destination zone, source/destination address, destination
+service) is cut into elementary intervals, each carrying a bitset of the rules
+that match it. A lookup is one binary search per dimension, an AND of the
+bitsets and a lowest-set-bit scan. Bitsets are split into blocks in rule
+order, so the AND stops at the first block that holds a match.
+
+Rules with URL conditions need application data that a 5-tuple does not carry,
+so both engines skip them. MONITOR rules log matching traffic and evaluation
+continues with the next rule, so they never decide a flow and are skipped too.
+"""
+
+import random
+from bisect import bisect_right
+from collections import namedtuple
+
+from analysis.resolve import PROTOCOL_NUMBERS, PORT_MAX
+
+
+# One flow to classify; destination_port holds (type << 8) | code for ICMP
+Packet = namedtuple('Packet', ['source_zone', 'destination_zone', 'source_ip', 'destination_ip', 'protocol', 'destination_port'])
+
+
+def _contains(intervals, value):
+    """Return True if value falls into one of the sorted disjoint intervals"""
+    position = bisect_right(intervals, (value, float('inf'))) - 1
+    return position >= 0 and intervals[position][1] >= value
+
+
+# Rules per bitset block; lookups stop at the first block with a match
+BLOCK_BITS = 2048
+
+
+def build_bitset(rule_indexes, size):
+    """Build an int bitset from rule indexes through a bytearray (linear in size)"""
+    buffer = bytearray((size + 7) // 8)
+    for index in rule_indexes:
+        buffer[index >> 3] |= 1 << (index & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def _blocks(bits, size):
+    """Split a bitset into a tuple of BLOCK_BITS wide blocks, lowest rules first"""
+    mask = (1 << BLOCK_BITS) - 1
+    return tuple((bits >> start) & mask for start in range(0, max(size, 1), BLOCK_BITS))
+
+
+def decides(space):
+    """Return True if a rule can be the first match deciding a 5-tuple flow"""
+    return space.urls is None and space.action != 'MONITOR'
+
+
+class LinearClassifier:
+    """
+    Reference engine checking rules one by one.
+
+    Args:
+        spaces: RuleSpace list in rule order
+    """
+
+    def __init__(self, spaces):
+        self.spaces = [space for space in spaces if decides(space)]
+
+    def match(self, packet):
+        """Return the index of the first matching rule, or None"""
+        service = (packet.protocol << 16) | packet.destination_port
+        for space in self.spaces:
+            if space.source_zones is not None and packet.source_zone not in space.source_zones:
+                continue
+            if space.destination_zones is not None and packet.destination_zone not in space.destination_zones:
+                continue
+            if space.source_networks is not None and not _contains(space.source_networks, packet.source_ip):
+                continue
+            if space.destination_networks is not None and not _contains(space.destination_networks, packet.destination_ip):
+                continue
+            if space.destination_ports is not None and not _contains(space.destination_ports, service):
+                continue
+            return space.index
+        return None
+
+    def match_batch(self, packets):
+        """Classify a batch of packets"""
+        return [self.match(packet) for packet in packets]
+
+
+class _IntervalDimension:
+    """Elementary intervals of one numeric dimension with a rule bitset per interval"""
+
+    def __init__(self, rule_intervals, size):
+        any_rules = []
+        toggles = {}
+        for index, intervals in rule_intervals:
+            if intervals is None:
+                any_rules.append(index)
+                continue
+            # Intervals are disjoint, so each rule toggles on at lo and off after hi
+            for lo, hi in intervals:
+                toggles.setdefault(lo, []).append(index)
+                toggles.setdefault(hi + 1, []).append(index)
+
+        any_bits = build_bitset(any_rules, size)
+        self.any_bits = _blocks(any_bits, size)
+        self.points = sorted(toggles)
+        self.bits = []
+        running = 0
+        for point in self.points:
+            running ^= build_bitset(toggles[point], size)
+            self.bits.append(_blocks(running | any_bits, size))
+
+    def lookup(self, value):
+        position = bisect_right(self.points, value) - 1
+        if position < 0:
+            return self.any_bits
+        return self.bits[position]
+
+
+class _ZoneDimension:
+    """Rule bitset per zone name; unknown or missing zones only match zone-less rules"""
+
+    def __init__(self, rule_zones, size):
+        any_rules = []
+        by_zone = {}
+        for index, zones in rule_zones:
+            if zones is None:
+                any_rules.append(index)
+                continue
+            for zone in zones:
+                by_zone.setdefault(zone, []).append(index)
+
+        any_bits = build_bitset(any_rules, size)
+        self.any_bits = _blocks(any_bits, size)
+        self.bits = {zone: _blocks(build_bitset(indexes, size) | any_bits, size) for zone, indexes in by_zone.items()}
+
+    def lookup(self, zone):
+        return self.bits.get(zone, self.any_bits)
+
+
+class CompiledClassifier:
+    """
+    Bit-vector first-match classifier compiled from resolved rule spaces.
+
+    Memory is (elementary intervals x rules) bits per dimension. Elementary
+    intervals come from object boundaries, so they grow with the number of
+    referenced objects rather than with the number of rules.
+
+    Args:
+        spaces: RuleSpace list in rule order
+    """
+
+    def __init__(self, spaces):
+        spaces = [space for space in spaces if decides(space)]
+        size = len(spaces)
+        # Bit i stands for the i-th evaluable rule, mapped back to the policy rule index on match
+        self.rule_indexes = [space.index for space in spaces]
+
+        self.source_zones = _ZoneDimension([(i, s.source_zones) for i, s in enumerate(spaces)], size)
+        self.destination_zones = _ZoneDimension([(i, s.destination_zones) for i, s in enumerate(spaces)], size)
+        self.source_networks = _IntervalDimension([(i, s.source_networks) for i, s in enumerate(spaces)], size)
+        self.destination_networks = _IntervalDimension([(i, s.destination_networks) for i, s in enumerate(spaces)], size)
+        self.destination_ports = _IntervalDimension([(i, s.destination_ports) for i, s in enumerate(spaces)], size)
+
+    @property
+    def elementary_intervals(self):
+        """Number of elementary intervals per interval dimension"""
+        return {
+            'source_networks': len(self.source_networks.points),
+            'destination_networks': len(self.destination_networks.points),
+            'destination_ports': len(self.destination_ports.points)
+        }
+
+    def match(self, packet):
+        """Return the index of the first matching rule, or None"""
+        return self.match_batch([packet])[0]
+
+    def match_batch(self, packets):
+        """Classify a batch of packets"""
+        source_zones = self.source_zones.lookup
+        destination_zones = self.destination_zones.lookup
+        source_networks = self.source_networks.lookup
+        destination_networks = self.destination_networks.lookup
+        destination_ports = self.destination_ports.lookup
+        rule_indexes = self.rule_indexes
+
+        results = []
+        for packet in packets:
+            blocks = zip(
+                source_zones(packet.source_zone),
+                destination_zones(packet.destination_zone),
+                source_networks(packet.source_ip),
+                destination_networks(packet.destination_ip),
+                destination_ports((packet.protocol << 16) | packet.destination_port)
+            )
+            match = None
+            # Blocks are in rule order, so the first non-empty AND holds the first match
+            for offset, (a, b, c, d, e) in enumerate(blocks):
+                bits = a & b & c & d & e
+                if bits:
+                    match = rule_indexes[offset * BLOCK_BITS + (bits & -bits).bit_length() - 1]
+                    break
+            results.append(match)
+        return results
+
+
+def synthetic_packets(spaces, zones, count, seed=None):
+    """
+    Generate synthetic flows for a policy.
+
+    Half of the addresses and services are drawn from inside intervals the rules
+    reference, so lookups exercise real rule boundaries; the rest are random
+    10.0.0.0/8 addresses and services. Zones are drawn from the given zone names,
+    with a share of flows carrying no zone.
+
+    Args:
+        spaces: RuleSpace list of the policy
+        zones: Security zone names
+        count: Number of packets
+        seed: Optional random seed
+    """
+    rng = random.Random(seed)
+    networks = [i for s in spaces for field in (s.source_networks, s.destination_networks) if field for i in field]
+    services = [i for s in spaces if s.destination_ports for i in s.destination_ports]
+    zone_choices = list(zones) + [None]
+    protocols = list(PROTOCOL_NUMBERS.values())
+
+    def address():
+        if networks and rng.random() < 0.5:
+            lo, hi = rng.choice(networks)
+            return rng.randint(lo, hi)
+        return (10 << 24) | rng.getrandbits(24)
+
+    def service():
+        if services and rng.random() < 0.5:
+            lo, hi = rng.choice(services)
+            value = rng.randint(lo, hi)
+            return value >> 16, value & PORT_MAX
+        return rng.choice(protocols), rng.randint(0, PORT_MAX)
+
+    packets = []
+    for _ in range(count):
+        protocol, port = service()
+        packets.append(Packet(
+            rng.choice(zone_choices),
+            rng.choice(zone_choices),
+            address(),
+            address(),
+            protocol,
+            port
+        ))
+    return packets
@@ -0,0 +1,62 @@
+"""
+Static centered interval tree for stabbing queries
+"""
+
+
+class IntervalTree:
+    """
+    Centered interval tree over closed integer intervals.
+
+    Built once from all intervals; stab(point) returns the values of every
+    interval containing the point in O(log n + matches).
+
+    Args:
+        intervals: Iterable of (lo, hi, value) tuples
+    """
+
+    def __init__(self, intervals):
+        items = list(intervals)
+        self.size = len(items)
+        self.root = self._build(items)
+
+    def _build(self, items):
+        if not items:
+            return None
+
+        endpoints = sorted(point for lo, hi, _ in items for point in (lo, hi))
+        center = endpoints[len(endpoints) // 2]
+
+        left = [item for item in items if item[1] < center]
+        right = [item for item in items if item[0] > center]
+        middle = [item for item in items if item[0] <= center <= item[1]]
+
+        return (
+            center,
+            sorted(middle, key=lambda item: item[0]),
+            sorted(middle, key=lambda item: item[1], reverse=True),
+            self._build(left),
+            self._build(right)
+        )
+
+    def stab(self, point):
+        """Return the values of all intervals containing point"""
+        found = []
+        node = self.root
+        while node is not None:
+            center, by_lo, by_hi, left, right = node
+            if point < center:
+                for lo, _, value in by_lo:
+                    if lo > point:
+                        break
+                    found.append(value)
+                node = left
+            elif point > center:
+                for _, hi, value in by_hi:
+                    if hi < point:
+                        break
+                    found.append(value)
+                node = right
+            else:
+                found.extend(value for _, _, value in by_lo)
+                break
+        return found
@@ -0,0 +1,207 @@
+"""
+Persistent reverse reference index over generated files
+
+Every *.nac.yaml file is scanned once into the objects it defines and the
+references it holds (group members, access rule objects and zones, intrusion
+policy bases). The result is stored in a SQLite database next to the data, so
+"who uses X" is an indexed lookup plus a recursive query through nested groups.
+Files are tracked by modification time and size; only changed files are
+rescanned on update.
+"""
+
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from utils.file_ops import get_data_path, load_yaml_file
+from utils.pruning import ACCESS_RULE_REFERENCE_FIELDS
+
+
+INDEX_FILENAME = '.refindex.sqlite'
+
+# Fields of each object type that reference other objects
+OBJECT_REFERENCE_FIELDS = {
+    'network_groups': ['objects'],
+    'port_groups': ['objects'],
+    'url_groups': ['urls']
+}
+
+POLICY_REFERENCE_FIELDS = {
+    'intrusion_policies': ['base_policy']
+}
+
+# Names are interned to integer ids so references cost two integers each
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, name TEXT UNIQUE, mtime_ns INTEGER, size INTEGER);
+CREATE TABLE IF NOT EXISTS names (id INTEGER PRIMARY KEY, name TEXT UNIQUE);
+CREATE TABLE IF NOT EXISTS nodes (id INTEGER, kind TEXT, file INTEGER);
+CREATE TABLE IF NOT EXISTS refs (used INTEGER, user INTEGER, file INTEGER, PRIMARY KEY (used, user, file)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS nodes_id ON nodes (id);
+CREATE INDEX IF NOT EXISTS nodes_file ON nodes (file);
+CREATE INDEX IF NOT EXISTS refs_file ON refs (file);
+'''
+
+
+def access_rule_node(policy_name, rule_name):
+    """Node name of an access rule"""
+    return f'{policy_name}/{rule_name}'
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def scan_file(path):
+    """
+    Scan one generated file.
+
+    Returns (nodes, refs): nodes is a list of (name, kind), refs a list of (user, used).
+    """
+    data = load_yaml_file(path) or {}
+    nodes = []
+    refs = []
+
+    for domain in (data.get('fmc') or {}).get('domains', []):
+        for object_type, items in (domain.get('objects') or {}).items():
+            fields = OBJECT_REFERENCE_FIELDS.get(object_type, [])
+            for item in items or []:
+                nodes.append((item['name'], object_type))
+                for field in fields:
+                    refs.extend((item['name'], used) for used in _as_list(item.get(field)))
+
+        for policy_type, policies in (domain.get('policies') or {}).items():
+            fields = POLICY_REFERENCE_FIELDS.get(policy_type, [])
+            for policy in policies or []:
+                nodes.append((policy['name'], policy_type))
+                for field in fields:
+                    refs.extend((policy['name'], used) for used in _as_list(policy.get(field)))
+
+                for rule in policy.get('access_rules') or []:
+                    node = access_rule_node(policy['name'], rule['name'])
+                    nodes.append((node, 'access_rules'))
+                    for field in ACCESS_RULE_REFERENCE_FIELDS:
+                        refs.extend((node, used) for used in _as_list(rule.get(field)))
+
+    return nodes, refs
+
+
+class ReferenceIndex:
+    """
+    Reverse reference index stored in SQLite.
+
+    Args:
+        data_path: Data folder to index (defaults to the data folder)
+        index_path: Database file (defaults to data/.refindex.sqlite)
+    """
+
+    def __init__(self, data_path=None, index_path=None):
+        self.data_path = Path(data_path) if data_path else get_data_path()
+        self.index_path = Path(index_path) if index_path else self.data_path / INDEX_FILENAME
+        self.db = sqlite3.connect(self.index_path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _name_ids(self, names):
+        """Intern names and return a name to id mapping"""
+        self.db.executemany('INSERT OR IGNORE INTO names (name) VALUES (?)', ((name,) for name in names))
+        ids = {}
+        names = list(names)
+        # Stay below the SQLite host parameter limit
+        for start in range(0, len(names), 500):
+            chunk = names[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            ids.update(self.db.execute(f'SELECT name, id FROM names WHERE name IN ({placeholders})', chunk))
+        return ids
+
+    def update(self, rebuild=False, workers=None):
+        """
+        Bring the index up to date with the data folder.
+        Returns a dict with the number of scanned, removed and unchanged files.
+        """
+        if rebuild:
+            with self.db:
+                for table in ('files', 'names', 'nodes', 'refs'):
+                    self.db.execute(f'DELETE FROM {table}')
+
+        known = {name: (mtime_ns, size) for name, mtime_ns, size in self.db.execute('SELECT name, mtime_ns, size FROM files')}
+        current = {}
+        for path in self.data_path.glob('*.nac.yaml'):
+            stat = path.stat()
+            current[path.name] = (stat.st_mtime_ns, stat.st_size)
+
+        changed = sorted(name for name, signature in current.items() if known.get(name) != signature)
+        removed = sorted(name for name in known if name not in current)
+
+        # Large outputs span many files, scan them in parallel
+        paths = [self.data_path / name for name in changed]
+        if len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+                scanned = list(executor.map(scan_file, paths))
+        else:
+            scanned = [scan_file(path) for path in paths]
+
+        with self.db:
+            for name in removed + changed:
+                row = self.db.execute('SELECT id FROM files WHERE name = ?', (name,)).fetchone()
+                if row:
+                    self.db.execute('DELETE FROM nodes WHERE file = ?', row)
+                    self.db.execute('DELETE FROM refs WHERE file = ?', row)
+                    self.db.execute('DELETE FROM files WHERE id = ?', row)
+            for name, (nodes, refs) in zip(changed, scanned):
+                file_id = self.db.execute('INSERT INTO files (name, mtime_ns, size) VALUES (?, ?, ?)',
+                                          (name, *current[name])).lastrowid
+                ids = self._name_ids({n for n, _ in nodes} | {n for ref in refs for n in ref})
+                self.db.executemany('INSERT INTO nodes VALUES (?, ?, ?)',
+                                    ((ids[n], kind, file_id) for n, kind in nodes))
+                self.db.executemany('INSERT OR IGNORE INTO refs VALUES (?, ?, ?)',
+                                    ((ids[used], ids[user], file_id) for user, used in refs))
+
+        return {'scanned': len(changed), 'removed': len(removed), 'unchanged': len(current) - len(changed)}
+
+    def kind(self, name):
+        """Return the kind (object or policy type) of a node, or None if it is not defined"""
+        row = self.db.execute('''
+            SELECT nodes.kind FROM names JOIN nodes ON nodes.id = names.id WHERE names.name = ?
+        ''', (name,)).fetchone()
+        return row[0] if row else None
+
+    def _users(self, name, recursive):
+        """Return sorted (user, kind) pairs referencing name"""
+        recursion = """
+                UNION
+                SELECT refs.user FROM users CROSS JOIN refs ON refs.used = users.id""" if recursive else ''
+        return self.db.execute(f'''
+            WITH RECURSIVE users(id) AS (
+                SELECT refs.user FROM names CROSS JOIN refs ON refs.used = names.id WHERE names.name = ?
+                {recursion}
+            )
+            SELECT DISTINCT names.name, nodes.kind FROM users
+            CROSS JOIN names ON names.id = users.id
+            LEFT JOIN nodes ON nodes.id = users.id
+            ORDER BY names.name
+        ''', (name,)).fetchall()
+
+    def direct_users(self, name):
+        """Return sorted (user, kind) pairs referencing name directly"""
+        return self._users(name, recursive=False)
+
+    def all_users(self, name):
+        """Return sorted (user, kind) pairs referencing name directly or through nested groups"""
+        return self._users(name, recursive=True)
+
+    def impact(self, name):
+        """
+        Return what deleting name breaks.
+
+        Returns a dict with 'broken' (direct users left with a dangling reference)
+        and 'affected' (users whose effective contents change through nested groups).
+        """
+        broken = self.direct_users(name)
+        broken_names = {user for user, _ in broken}
+        affected = [(user, kind) for user, kind in self.all_users(name) if user not in broken_names]
+        return {'broken': broken, 'affected': affected}
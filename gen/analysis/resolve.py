@@ -0,0 +1,195 @@
+"""
+Resolution of generated objects into match spaces
+
+Network objects resolve to sorted, disjoint IPv4 address intervals. Port and
+ICMP objects resolve to intervals in a combined service space where a value is
+(protocol number << 16) | port, and ICMP uses (type << 8) | code as the port.
+"""
+
+import ipaddress
+from collections import namedtuple
+
+
+# IP protocol numbers of the protocols used by generated port objects
+PROTOCOL_NUMBERS = {
+    'ICMP': 1,
+    'TCP': 6,
+    'UDP': 17,
+    'ESP': 50
+}
+
+PORT_MAX = 0xFFFF
+
+# Resolved match space of one access rule; None means "any" for that field
+RuleSpace = namedtuple('RuleSpace', [
+    'index', 'name', 'action', 'category',
+    'source_zones', 'destination_zones',
+    'source_networks', 'destination_networks',
+    'destination_ports', 'urls'
+])
+
+
+def service_value(protocol, port=0):
+    """Encode a protocol number and port (or ICMP type/code) into the service space"""
+    return (protocol << 16) | port
+
+
+def merge_intervals(intervals):
+    """Sort intervals and merge overlapping or adjacent ones"""
+    merged = []
+    for lo, hi in sorted(intervals):
+        if merged and lo <= merged[-1][1] + 1:
+            if hi > merged[-1][1]:
+                merged[-1] = (merged[-1][0], hi)
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def ip_to_int(ip):
+    """Convert a dotted IPv4 address to an integer"""
+    return int(ipaddress.IPv4Address(ip))
+
+
+class ObjectResolver:
+    """
+    Resolve object names from generated data into address, service and URL sets.
+
+    Objects of all domains are indexed together; generated names are unique across
+    domains and child domains reference objects of their ancestors by name.
+
+    Args:
+        domains: Output of load_fmc_data()
+    """
+
+    def __init__(self, domains):
+        self.objects = {}
+        for domain in domains.values():
+            for object_type, items in domain['objects'].items():
+                for item in items:
+                    self.objects[item['name']] = (object_type, item)
+        self._networks = {}
+        self._services = {}
+        self._urls = {}
+
+    def _lookup(self, name):
+        try:
+            return self.objects[name]
+        except KeyError:
+            raise ValueError(f"Object '{name}' is not defined") from None
+
+    def network_intervals(self, name, _stack=()):
+        """Return the merged address intervals of a host, network, range or network group"""
+        if name in self._networks:
+            return self._networks[name]
+        if name in _stack:
+            raise ValueError(f"Network group '{name}' references itself")
+
+        object_type, item = self._lookup(name)
+        if object_type == 'hosts':
+            value = ip_to_int(item['ip'])
+            intervals = [(value, value)]
+        elif object_type == 'networks':
+            network = ipaddress.IPv4Network(item['prefix'], strict=False)
+            intervals = [(int(network.network_address), int(network.broadcast_address))]
+        elif object_type == 'ranges':
+            start, end = item['ip_range'].split('-')
+            intervals = [(ip_to_int(start), ip_to_int(end))]
+        elif object_type == 'network_groups':
+            collected = []
+            for member in item.get('objects', []):
+                collected.extend(self.network_intervals(member, _stack + (name,)))
+            intervals = merge_intervals(collected)
+        else:
+            raise ValueError(f"Object '{name}' is not a network object ({object_type})")
+
+        self._networks[name] = intervals
+        return intervals
+
+    def service_intervals(self, name, _stack=()):
+        """Return the merged service space intervals of a port, ICMPv4 or port group"""
+        if name in self._services:
+            return self._services[name]
+        if name in _stack:
+            raise ValueError(f"Port group '{name}' references itself")
+
+        object_type, item = self._lookup(name)
+        if object_type == 'ports':
+            protocol = PROTOCOL_NUMBERS[item['protocol']]
+            if 'port' in item:
+                lo, _, hi = str(item['port']).partition('-')
+                intervals = [(service_value(protocol, int(lo)), service_value(protocol, int(hi or lo)))]
+            else:
+                intervals = [(service_value(protocol), service_value(protocol, PORT_MAX))]
+        elif object_type == 'icmpv4s':
+            value = service_value(PROTOCOL_NUMBERS['ICMP'], (int(item['icmp_type']) << 8) | int(item['code']))
+            intervals = [(value, value)]
+        elif object_type == 'port_groups':
+            collected = []
+            for member in item.get('objects', []):
+                collected.extend(self.service_intervals(member, _stack + (name,)))
+            intervals = merge_intervals(collected)
+        else:
+            raise ValueError(f"Object '{name}' is not a port object ({object_type})")
+
+        self._services[name] = intervals
+        return intervals
+
+    def url_values(self, name):
+        """Return the set of URLs of a URL object or URL group"""
+        if name in self._urls:
+            return self._urls[name]
+
+        object_type, item = self._lookup(name)
+        if object_type == 'urls':
+            values = frozenset([item['url']])
+        elif object_type == 'url_groups':
+            values = set(item.get('literals', []))
+            for member in item.get('urls', []):
+                values |= self.url_values(member)
+            values = frozenset(values)
+        else:
+            raise ValueError(f"Object '{name}' is not a URL object ({object_type})")
+
+        self._urls[name] = values
+        return values
+
+    def _union(self, names, resolve):
+        if not names:
+            return None
+        collected = []
+        for name in names:
+            collected.extend(resolve(name))
+        return merge_intervals(collected)
+
+    def rule_space(self, index, rule):
+        """Resolve the match space of an access rule"""
+        urls = None
+        if rule.get('url_objects'):
+            urls = frozenset().union(*(self.url_values(name) for name in rule['url_objects']))
+
+        return RuleSpace(
+            index=index,
+            name=rule['name'],
+            action=rule['action'],
+            category=rule.get('category'),
+            source_zones=frozenset(rule['source_zones']) if rule.get('source_zones') else None,
+            destination_zones=frozenset(rule['destination_zones']) if rule.get('destination_zones') else None,
+            source_networks=self._union(rule.get('source_network_objects'), self.network_intervals),
+            destination_networks=self._union(rule.get('destination_network_objects'), self.network_intervals),
+            destination_ports=self._union(rule.get('destination_port_objects'), self.service_intervals),
+            urls=urls
+        )
+
+    def policy_spaces(self, policy):
+        """Resolve the match spaces of all rules of an access control policy, in rule order"""
+        return [self.rule_space(index, rule) for index, rule in enumerate(policy.get('access_rules', []))]
+
+
+def load_policies(domains):
+    """Return a dict of access control policy name -> policy over all domains"""
+    policies = {}
+    for domain in domains.values():
+        for policy in domain['policies'].get('access_control_policies', []):
+            policies[policy['name']] = policy
+    return policies
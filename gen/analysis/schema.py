@@ -0,0 +1,378 @@
+"""
+Declarative schema of generated nac-fmc data, compiled into check functions
+
+Every object and policy type is described by its fields and by named record
+checks for constraints spanning several fields. compile_schema turns the
+description into one check function per type, so per-record validation is a
+loop over prepared closures without any schema lookups.
+"""
+
+import ipaddress
+
+from generators.service_objects import PORT_PROTOCOLS, ICMPV4_TYPE_CODES
+from generators.zone_objects import INTERFACE_TYPES
+from generators.policy_objects import (
+    INSPECTION_MODES,
+    ACCESS_CONTROL_POLICY_DEFAULT_ACTIONS,
+    ACCESS_RULE_ACTIONS,
+    ACTIONS_WITHOUT_INTRUSION_POLICY,
+    CATEGORY_SECTIONS
+)
+
+
+PORT_MIN = 1
+PORT_MAX = 65535
+
+NAME = {'type': 'string', 'required': True}
+NAMES = {'type': 'list', 'items': {'type': 'string'}}
+FLAG = {'type': 'boolean'}
+
+# Field types: string, integer (min, max), boolean, ipv4, ipv4_prefix, ipv4_range,
+# port, list (items) and records (schema, a list of records of another type).
+# Any field may set 'required' and 'values' (allowed values).
+# A records field with 'stream' is validated item by item while reading; only the
+# named item field is kept in the parent record for its checks.
+SCHEMA = {
+    'hosts': {
+        'fields': {'name': NAME, 'ip': {'type': 'ipv4', 'required': True}, 'description': {'type': 'string'}}
+    },
+    'networks': {
+        'fields': {'name': NAME, 'prefix': {'type': 'ipv4_prefix', 'required': True}, 'description': {'type': 'string'}}
+    },
+    'ranges': {
+        'fields': {'name': NAME, 'ip_range': {'type': 'ipv4_range', 'required': True}, 'description': {'type': 'string'}}
+    },
+    'ports': {
+        'fields': {
+            'name': NAME,
+            'protocol': {'type': 'string', 'required': True, 'values': PORT_PROTOCOLS},
+            'port': {'type': 'port'},
+            'description': {'type': 'string'}
+        }
+    },
+    'icmpv4s': {
+        'fields': {
+            'name': NAME,
+            'icmp_type': {'type': 'integer', 'required': True, 'min': 0, 'max': 255},
+            'code': {'type': 'integer', 'min': 0, 'max': 255},
+            'description': {'type': 'string'}
+        },
+        'checks': ['icmp_type_code']
+    },
+    'security_zones': {
+        'fields': {'name': NAME, 'interface_type': {'type': 'string', 'required': True, 'values': INTERFACE_TYPES}}
+    },
+    'urls': {
+        'fields': {'name': NAME, 'url': {'type': 'string', 'required': True}, 'description': {'type': 'string'}}
+    },
+    'port_groups': {
+        'fields': {'name': NAME, 'objects': dict(NAMES, required=True), 'description': {'type': 'string'}}
+    },
+    'network_groups': {
+        'fields': {'name': NAME, 'objects': dict(NAMES, required=True), 'description': {'type': 'string'}}
+    },
+    'url_groups': {
+        'fields': {'name': NAME, 'urls': NAMES, 'literals': NAMES, 'description': {'type': 'string'}}
+    },
+    'intrusion_policies': {
+        'fields': {
+            'name': NAME,
+            'inspection_mode': {'type': 'string', 'values': INSPECTION_MODES},
+            'base_policy': {'type': 'string'}
+        }
+    },
+    'access_control_policies': {
+        'fields': {
+            'name': NAME,
+            'default_action': {'type': 'string', 'values': ACCESS_CONTROL_POLICY_DEFAULT_ACTIONS},
+            'categories': {'type': 'records', 'schema': 'categories'},
+            'access_rules': {'type': 'records', 'schema': 'access_rules', 'stream': 'category'}
+        },
+        'checks': ['category_order']
+    },
+    'categories': {
+        'fields': {'name': NAME, 'section': {'type': 'string', 'required': True, 'values': CATEGORY_SECTIONS}}
+    },
+    'access_rules': {
+        'fields': {
+            'name': NAME,
+            'action': {'type': 'string', 'required': True, 'values': ACCESS_RULE_ACTIONS},
+            'category': {'type': 'string'},
+            'source_zones': NAMES,
+            'destination_zones': NAMES,
+            'source_network_objects': NAMES,
+            'destination_network_objects': NAMES,
+            'destination_port_objects': NAMES,
+            'url_objects': NAMES,
+            'intrusion_policy': {'type': 'string'},
+            'send_events_to_fmc': FLAG,
+            'log_connection_begin': FLAG,
+            'log_connection_end': FLAG
+        },
+        'checks': ['intrusion_policy_action', 'logging']
+    }
+}
+
+
+def check_icmp_type_code(record):
+    """ICMP type and code must be a known combination"""
+    icmp_type = record.get('icmp_type')
+    code = record.get('code')
+    # Values of the wrong type are reported by the field checks
+    if not _is_integer(icmp_type) or (code is not None and not _is_integer(code)):
+        return
+    if icmp_type not in ICMPV4_TYPE_CODES:
+        yield 'icmp_type', f"unknown ICMP type {icmp_type}"
+    elif code is not None and code not in ICMPV4_TYPE_CODES[icmp_type]:
+        yield 'code', f"code {code} is not valid for ICMP type {icmp_type}"
+
+
+def check_intrusion_policy_action(record):
+    """Intrusion policies cannot be used with blocking, trusting or monitoring actions"""
+    if record.get('intrusion_policy') is not None and record.get('action') in ACTIONS_WITHOUT_INTRUSION_POLICY:
+        yield 'intrusion_policy', f"not allowed with action {record['action']}"
+
+
+def check_logging(record):
+    """Logging settings required by the rule action"""
+    action = record.get('action')
+    begin = record.get('log_connection_begin', False)
+    end = record.get('log_connection_end', False)
+    if action == 'MONITOR':
+        if begin:
+            yield 'log_connection_begin', "must be false for MONITOR rules"
+        if not end:
+            yield 'log_connection_end', "must be true for MONITOR rules"
+    elif action in ('BLOCK', 'BLOCK_RESET') and end:
+        yield 'log_connection_end', f"must be false for {action} rules"
+    if record.get('send_events_to_fmc') and not begin and not end:
+        yield 'send_events_to_fmc', "requires log_connection_begin or log_connection_end"
+
+
+def check_category_order(record):
+    """
+    Mandatory categories come before default ones, and rules reference existing
+    categories in category order. access_rules holds the streamed rule categories.
+    Rules are only checked when the record holds the categories of the policy.
+    """
+    categories = [category for category in record.get('categories') or [] if isinstance(category, dict)]
+    default_seen = False
+    for index, category in enumerate(categories):
+        if category.get('section') == 'default':
+            default_seen = True
+        elif category.get('section') == 'mandatory' and default_seen:
+            yield f'categories[{index}]', "mandatory category after a default category"
+
+    # Fragments of a split policy without the categories cannot be checked on their own
+    if 'categories' not in record:
+        return
+
+    # Names and rule categories that are not strings are reported by the field checks
+    positions = {
+        category.get('name'): index
+        for index, category in enumerate(categories) if isinstance(category.get('name'), str)
+    }
+    last = 0
+    for index, category in enumerate(record.get('access_rules') or []):
+        if not isinstance(category, str):
+            continue
+        position = positions.get(category)
+        if position is None:
+            yield f'access_rules[{index}].category', f"unknown category {category}"
+        elif position < last:
+            yield f'access_rules[{index}].category', f"category {category} after a later category"
+        else:
+            last = position
+
+
+RECORD_CHECKS = {
+    'icmp_type_code': check_icmp_type_code,
+    'intrusion_policy_action': check_intrusion_policy_action,
+    'logging': check_logging,
+    'category_order': check_category_order
+}
+
+
+def _is_integer(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_ipv4(value):
+    try:
+        ipaddress.IPv4Address(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _check_ipv4(value):
+    if not isinstance(value, str) or not _is_ipv4(value):
+        return "must be an IPv4 address"
+
+
+def _check_ipv4_prefix(value):
+    if not isinstance(value, str) or '/' not in value:
+        return "must be an IPv4 prefix"
+    try:
+        ipaddress.IPv4Network(value, strict=False)
+    except ValueError:
+        return "must be an IPv4 prefix"
+
+
+def _check_ipv4_range(value):
+    parts = value.split('-') if isinstance(value, str) else []
+    if len(parts) != 2 or not _is_ipv4(parts[0]) or not _is_ipv4(parts[1]):
+        return "must be an IPv4 range (first-last)"
+    if ipaddress.IPv4Address(parts[0]) > ipaddress.IPv4Address(parts[1]):
+        return "range start is after range end"
+
+
+def _check_port(value):
+    if isinstance(value, bool):
+        return "must be a port or port range"
+    if isinstance(value, int):
+        lo = hi = value
+    else:
+        parts = value.split('-') if isinstance(value, str) else []
+        if len(parts) not in (1, 2) or not all(part.isdigit() for part in parts):
+            return "must be a port or port range"
+        lo, hi = int(parts[0]), int(parts[-1])
+    if not PORT_MIN <= lo <= PORT_MAX or not PORT_MIN <= hi <= PORT_MAX:
+        return f"ports must be between {PORT_MIN} and {PORT_MAX}"
+    if lo > hi:
+        return "range start is after range end"
+
+
+def _compile_field(spec, compiled):
+    """Return a function mapping a value to an error message or None"""
+    kind = spec['type']
+
+    if kind == 'string':
+        def check(value):
+            if not isinstance(value, str):
+                return "must be a string"
+    elif kind == 'integer':
+        low = spec.get('min')
+        high = spec.get('max')
+
+        def check(value):
+            if not _is_integer(value):
+                return "must be an integer"
+            if (low is not None and value < low) or (high is not None and value > high):
+                return f"must be between {low} and {high}"
+    elif kind == 'boolean':
+        def check(value):
+            if not isinstance(value, bool):
+                return "must be a boolean"
+    elif kind == 'ipv4':
+        check = _check_ipv4
+    elif kind == 'ipv4_prefix':
+        check = _check_ipv4_prefix
+    elif kind == 'ipv4_range':
+        check = _check_ipv4_range
+    elif kind == 'port':
+        check = _check_port
+    elif kind == 'list':
+        item_check = _compile_field(spec['items'], compiled)
+
+        def check(value):
+            if not isinstance(value, list):
+                return "must be a list"
+            for index, item in enumerate(value):
+                message = item_check(item)
+                if message:
+                    return f"item {index} {message}"
+    elif kind == 'records':
+        # Records are checked by the caller with the compiled check of their type
+        def check(value):
+            if not isinstance(value, list):
+                return "must be a list"
+    else:
+        raise ValueError(f"unknown field type '{kind}'")
+
+    values = spec.get('values')
+    if values is None:
+        return check
+
+    allowed = frozenset(values)
+    type_check = check
+
+    def check(value):
+        message = type_check(value)
+        if message:
+            return message
+        if value not in allowed:
+            return f"must be one of {', '.join(str(v) for v in values)}"
+    return check
+
+
+def _compile_record(spec, compiled):
+    fields = [
+        (name, field_spec.get('required', False), _compile_field(field_spec, compiled))
+        for name, field_spec in spec['fields'].items()
+    ]
+    # Nested record lists that are not streamed are validated here
+    nested = [
+        (name, field_spec['schema'])
+        for name, field_spec in spec['fields'].items()
+        if field_spec['type'] == 'records' and 'stream' not in field_spec
+    ]
+    checks = [RECORD_CHECKS[name] for name in spec.get('checks', [])]
+
+    def check(record, path, violations, record_checks=True):
+        if not isinstance(record, dict):
+            violations.append((path, "must be a mapping"))
+            return
+        for name, required, field_check in fields:
+            value = record.get(name)
+            if value is None:
+                if required:
+                    violations.append((f'{path}.{name}', "is required"))
+                continue
+            message = field_check(value)
+            if message:
+                violations.append((f'{path}.{name}', message))
+        for name, schema in nested:
+            items = record.get(name)
+            if isinstance(items, list):
+                item_check = compiled[schema]
+                for index, item in enumerate(items):
+                    item_check(item, f'{path}.{name}[{index}]', violations)
+        if record_checks:
+            run_record_checks(record, path, violations)
+
+    def run_record_checks(record, path, violations):
+        for record_check in checks:
+            for field, message in record_check(record):
+                violations.append((f'{path}.{field}', message))
+
+    # Records whose streamed fields are validated separately run their record checks later
+    check.record_checks = run_record_checks
+    return check
+
+
+def compile_schema(schema=SCHEMA):
+    """
+    Compile a schema description into check functions.
+
+    Returns:
+        Dict of type to check(record, path, violations, record_checks=True), appending
+        (path, message) tuples; check.record_checks(record, path, violations) runs the
+        record checks alone
+    """
+    compiled = {}
+    for name, spec in schema.items():
+        compiled[name] = _compile_record(spec, compiled)
+    return compiled
+
+
+def streamed_fields(schema=SCHEMA):
+    """Return {type: {field: (item type, kept item field)}} of record lists validated while streaming"""
+    return {
+        name: {
+            field: (field_spec['schema'], field_spec['stream'])
+            for field, field_spec in spec['fields'].items()
+            if field_spec.get('stream')
+        }
+        for name, spec in schema.items()
+    }
@@ -0,0 +1,175 @@
+"""
+Shadowed and redundant access rule detection
+
+A rule is dead when an earlier rule's match space contains its whole match
+space: it can never be the first match. It is reported as shadowed when the
+covering rule has a different action and as redundant when the action is the
+same. Only single-rule coverage is detected; a rule covered by the union of
+several earlier rules is not reported. MONITOR rules never shadow: FMC logs the
+traffic they match and continues with the next rule, so they only count as
+covered rules, never as covering ones.
+
+Candidate covering rules are found without comparing all pairs: interval trees
+over source addresses, destination addresses and destination services return
+the rules containing one point of the rule under test. The candidates are
+intersected as bitsets with the zone, URL and "any" masks and then verified in
+rule order. Query points are object boundaries, so stabbing results are cached
+per point and shared by every rule referencing the same object.
+"""
+
+from collections import namedtuple
+
+from analysis.engine import build_bitset
+from analysis.intervals import IntervalTree
+
+
+# A dead rule and the earlier rule covering it
+DeadRule = namedtuple('DeadRule', ['index', 'name', 'kind', 'covered_by', 'covered_by_name'])
+
+
+def intervals_cover(outer, inner):
+    """Return True if the union of outer intervals contains all inner intervals (None means any)"""
+    if outer is None:
+        return True
+    if inner is None:
+        return False
+    position = 0
+    for lo, hi in inner:
+        # Both lists are sorted and disjoint, so each inner interval must fit into one outer interval
+        while position < len(outer) and outer[position][1] < lo:
+            position += 1
+        if position == len(outer) or outer[position][0] > lo or outer[position][1] < hi:
+            return False
+    return True
+
+
+def values_cover(outer, inner):
+    """Return True if the outer set contains the inner set (None means any)"""
+    if outer is None:
+        return True
+    if inner is None:
+        return False
+    return inner <= outer
+
+
+def space_covers(outer, inner):
+    """Return True if every flow matching inner also matches outer"""
+    return (
+        values_cover(outer.source_zones, inner.source_zones)
+        and values_cover(outer.destination_zones, inner.destination_zones)
+        and intervals_cover(outer.source_networks, inner.source_networks)
+        and intervals_cover(outer.destination_networks, inner.destination_networks)
+        and intervals_cover(outer.destination_ports, inner.destination_ports)
+        and values_cover(outer.urls, inner.urls)
+    )
+
+
+class _IntervalIndex:
+    """Interval tree over one interval field plus the bitset of rules matching any value"""
+
+    def __init__(self, spaces, field, size):
+        self.any_bits = build_bitset([i for i, s in enumerate(spaces) if getattr(s, field) is None], size)
+        self.tree = IntervalTree(
+            (lo, hi, i)
+            for i, s in enumerate(spaces) if getattr(s, field) is not None
+            for lo, hi in getattr(s, field)
+        )
+        self.field = field
+        self.size = size
+        self._stabbed = {}
+
+    def candidates(self, space):
+        """Bitset of rules that may contain the field of space"""
+        intervals = getattr(space, self.field)
+        if intervals is None:
+            return self.any_bits
+        # A covering rule must contain every point of the field, in particular the first one.
+        # Query points are object boundaries shared by many rules, so results are cached per point
+        point = intervals[0][0]
+        bits = self._stabbed.get(point)
+        if bits is None:
+            bits = self.any_bits | build_bitset(self.tree.stab(point), self.size)
+            self._stabbed[point] = bits
+        return bits
+
+
+class _ValueIndex:
+    """Bitset per value of a set field (zones, URLs) plus the bitset of rules matching any value"""
+
+    def __init__(self, spaces, field, size):
+        self.any_bits = build_bitset([i for i, s in enumerate(spaces) if getattr(s, field) is None], size)
+        by_value = {}
+        for i, s in enumerate(spaces):
+            for value in getattr(s, field) or ():
+                by_value.setdefault(value, []).append(i)
+        self.bits = {value: build_bitset(indexes, size) for value, indexes in by_value.items()}
+        self.field = field
+
+    def candidates(self, space):
+        """Bitset of rules whose set contains the whole set of space"""
+        values = getattr(space, self.field)
+        if values is None:
+            return self.any_bits
+        common = None
+        for value in values:
+            bits = self.bits.get(value, 0)
+            common = bits if common is None else common & bits
+        return self.any_bits | common
+
+
+def find_dead_rules(spaces):
+    """
+    Find shadowed and redundant rules of one policy.
+
+    Args:
+        spaces: RuleSpace list in rule order
+
+    Returns:
+        List of DeadRule in rule order
+    """
+    size = len(spaces)
+    indexes = [
+        _ValueIndex(spaces, 'source_zones', size),
+        _ValueIndex(spaces, 'destination_zones', size),
+        _IntervalIndex(spaces, 'source_networks', size),
+        _IntervalIndex(spaces, 'destination_networks', size),
+        _IntervalIndex(spaces, 'destination_ports', size),
+        _ValueIndex(spaces, 'urls', size)
+    ]
+    # MONITOR rules let traffic continue to later rules
+    covering = build_bitset([i for i, s in enumerate(spaces) if s.action != 'MONITOR'], size)
+
+    dead = []
+    for position, space in enumerate(spaces):
+        if position == 0:
+            continue
+        # Only earlier rules can take traffic away from this one
+        mask = ((1 << position) - 1) & covering
+        for index in indexes:
+            mask &= index.candidates(space)
+            if not mask:
+                break
+
+        # Candidates are checked in rule order, the first verified one is reported
+        while mask:
+            lowest = mask & -mask
+            candidate = spaces[lowest.bit_length() - 1]
+            if space_covers(candidate, space):
+                kind = 'redundant' if candidate.action == space.action else 'shadowed'
+                dead.append(DeadRule(space.index, space.name, kind, candidate.index, candidate.name))
+                break
+            mask ^= lowest
+
+    return dead
+
+
+def find_dead_rules_naive(spaces):
+    """Quadratic reference implementation of find_dead_rules, for verification"""
+    dead = []
+    for position, space in enumerate(spaces):
+        for candidate in spaces[:position]:
+            if candidate.action != 'MONITOR' and space_covers(candidate, space):
+                kind = 'redundant' if candidate.action == space.action else 'shadowed'
+                dead.append(DeadRule(space.index, space.name, kind, candidate.index, candidate.name))
+                break
+    return dead
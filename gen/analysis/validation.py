@@ -0,0 +1,584 @@
+"""
+Streaming validation of generated files
+
+Files are read as a libyaml event stream instead of being loaded: records are
+built directly from the events one at a time and checked with the compiled
+schema, so memory does not grow with the number of access rules. Building
+records from events skips the pure Python constructor of yaml.load, which
+dominates loading time for large files.
+
+A policy with many rules is usually a single file, so large files are split
+across the process pool: the block sequences of streamed record lists (access
+rules) are cut into chunks at item boundaries and validated in parallel, while
+an outline of the file with a placeholder in place of every cut sequence is
+validated on its own. The record checks of a record with cut sequences run
+once the chunks are merged, and violations are merged back into file order.
+Whenever a chunk or the outline cannot be read, the whole file is validated
+again in one piece, so read errors are reported against the real file.
+"""
+
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import yaml
+from yaml.events import (
+    AliasEvent,
+    DocumentEndEvent,
+    DocumentStartEvent,
+    MappingEndEvent,
+    MappingStartEvent,
+    ScalarEvent,
+    SequenceEndEvent,
+    SequenceStartEvent,
+    StreamEndEvent,
+    StreamStartEvent
+)
+from yaml.nodes import ScalarNode
+
+from analysis.schema import compile_schema, streamed_fields
+from utils.file_ops import SafeLoader
+
+
+STR_TAG = 'tag:yaml.org,2002:str'
+
+# Top level keys, 'existing' wraps another 'fmc' key
+ROOT_KEYS = ['fmc', 'existing']
+
+# Domain keys holding record types
+SECTIONS = ['objects', 'policies']
+
+# Files are split when their record lists hold at least two chunks of this size
+CHUNK_BYTES = 4 * 1024 * 1024
+
+# Tag of the placeholder standing in for a cut sequence in a file outline
+CHUNKED_TAG = '!chunked'
+
+# Resolved plain scalars are cached up to this many distinct values
+SCALAR_CACHE_SIZE = 65536
+
+_resolver = yaml.resolver.Resolver()
+_constructor = yaml.constructor.SafeConstructor()
+_plain_scalars = {}
+_missing = object()
+
+
+def _scalar(event):
+    """Resolve a scalar event the way the safe loader does"""
+    value = event.value
+    if event.implicit[0]:
+        # Plain scalars resolve by value alone and names repeat across records
+        resolved = _plain_scalars.get(value, _missing)
+        if resolved is not _missing:
+            return resolved
+        tag = _resolver.resolve(ScalarNode, value, (True, False))
+        resolved = value
+        if tag != STR_TAG:
+            construct = _constructor.yaml_constructors.get(tag)
+            if construct:
+                resolved = construct(_constructor, ScalarNode(tag, value))
+        if len(_plain_scalars) >= SCALAR_CACHE_SIZE:
+            _plain_scalars.clear()
+        _plain_scalars[value] = resolved
+        return resolved
+    if event.implicit[1] or event.tag in (None, '!'):
+        return value
+    tag = event.tag
+    if tag == STR_TAG:
+        return value
+    construct = _constructor.yaml_constructors.get(tag)
+    return construct(_constructor, ScalarNode(tag, value)) if construct else value
+
+
+class _EventReader:
+    """Builds Python values from a libyaml event stream"""
+
+    def __init__(self, stream):
+        self.loader = SafeLoader(stream)
+        # Events are pulled from the parser directly, without the yaml.parse generator
+        self.next = self.loader.get_event
+        self.anchors = {}
+
+    def close(self):
+        self.loader.dispose()
+
+    def value(self, event):
+        """Build the value starting with event"""
+        kind = type(event)
+        if kind is ScalarEvent:
+            value = _scalar(event)
+        elif kind is MappingStartEvent:
+            value = {}
+            next_event = self.next
+            while True:
+                key_event = next_event()
+                if type(key_event) is MappingEndEvent:
+                    break
+                key = self.value(key_event)
+                if isinstance(key, (list, dict)):
+                    raise ValueError(f"unhashable mapping key at line {key_event.start_mark.line + 1}")
+                item_event = next_event()
+                if type(item_event) is ScalarEvent and not item_event.anchor:
+                    value[key] = _scalar(item_event)
+                else:
+                    value[key] = self.value(item_event)
+        elif kind is SequenceStartEvent:
+            value = []
+            next_event = self.next
+            while True:
+                item_event = next_event()
+                item_kind = type(item_event)
+                if item_kind is SequenceEndEvent:
+                    break
+                if item_kind is ScalarEvent and not item_event.anchor:
+                    value.append(_scalar(item_event))
+                else:
+                    value.append(self.value(item_event))
+        elif kind is AliasEvent:
+            if event.anchor not in self.anchors:
+                raise ValueError(f"undefined alias {event.anchor} at line {event.start_mark.line + 1}")
+            return self.anchors[event.anchor]
+        else:
+            raise ValueError(f"unexpected {kind.__name__}")
+        if event.anchor:
+            self.anchors[event.anchor] = value
+        return value
+
+    def items(self, end):
+        """Yield the events starting each item until the end event of the current collection"""
+        while True:
+            event = self.next()
+            if type(event) is end:
+                return
+            yield event
+
+    def skip(self, event):
+        """Consume the value starting with event"""
+        self.value(event)
+
+
+class FileValidator:
+    """
+    Validates generated files against the compiled schema.
+
+    Args:
+        schema: Optional schema description (defaults to analysis.schema.SCHEMA)
+    """
+
+    def __init__(self, schema=None):
+        self.checks = compile_schema(schema) if schema else compile_schema()
+        self.streamed = streamed_fields(schema) if schema else streamed_fields()
+        self.deferred = None
+
+    def validate(self, path):
+        """
+        Validate one file.
+
+        A file that cannot be read to the end is reported as a violation of the
+        whole file, after the violations found up to that point.
+
+        Returns:
+            (records, violations): number of checked records and a list of (path, message)
+        """
+        violations = []
+        self.records = 0
+        with open(path, 'rb') as f:
+            self._read(f, lambda reader: self._documents(reader, violations), violations)
+        return self.records, violations
+
+    def validate_outline(self, data):
+        """
+        Validate a file outline whose cut sequences are CHUNKED_TAG placeholders.
+
+        Returns:
+            (records, violations, deferred, ok): deferred lists the records with cut
+            sequences as (record_type, path, record, fields, check_position), fields
+            being (field, sequence, position) with the violation positions the items
+            and the record checks belong at; ok is False if the outline could not be read
+        """
+        violations = []
+        self.records = 0
+        self.deferred = []
+        try:
+            ok = self._read(data, lambda reader: self._documents(reader, violations), violations)
+            return self.records, violations, self.deferred, ok
+        finally:
+            self.deferred = None
+
+    def validate_items(self, data, item_type, kept_field, first_index):
+        """
+        Validate a chunk of a cut sequence, a YAML block sequence of records.
+
+        Returns:
+            (records, violations, kept, ok): violation paths start at the item index
+            ('[12].name'), kept holds the kept_field value of every record
+        """
+        violations = []
+        kept = []
+        self.records = 0
+
+        def walk(reader):
+            events = [type(reader.next()), type(reader.next())]
+            event = reader.next()
+            if events != [StreamStartEvent, DocumentStartEvent] or type(event) is not SequenceStartEvent:
+                raise ValueError("chunk is not a block sequence")
+            kept.extend(self._records(reader, event, item_type, '', violations, kept_field, first_index))
+            if [type(reader.next()), type(reader.next())] != [DocumentEndEvent, StreamEndEvent]:
+                raise ValueError("chunk holds more than one sequence")
+
+        ok = self._read(data, walk, violations)
+        return self.records, violations, kept, ok
+
+    def _read(self, stream, walk, violations):
+        """Run walk over the events of a stream, returns False if the stream could not be read"""
+        reader = _EventReader(stream)
+        try:
+            walk(reader)
+        except yaml.YAMLError as e:
+            # Parser messages span several lines, violations are listed one per line
+            violations.append(('', f"invalid YAML: {' '.join(str(e).split())}"))
+            return False
+        except (ValueError, TypeError) as e:
+            violations.append(('', f"cannot be loaded: {e}"))
+            return False
+        finally:
+            reader.close()
+        return True
+
+    def _documents(self, reader, violations):
+        """Walk every document of a stream"""
+        while True:
+            event = reader.next()
+            kind = type(event)
+            if kind is StreamEndEvent:
+                return
+            if kind is MappingStartEvent:
+                self._root(reader, '', violations)
+            elif kind in (ScalarEvent, SequenceStartEvent):
+                violations.append(('', "document must be a mapping"))
+                reader.skip(event)
+
+    def _root(self, reader, path, violations):
+        """Walk a mapping holding 'fmc' and 'existing' (existing objects, same layout)"""
+        for key_event in reader.items(MappingEndEvent):
+            key = reader.value(key_event)
+            event = reader.next()
+            if key not in ROOT_KEYS:
+                reader.skip(event)
+            elif type(event) is not MappingStartEvent:
+                violations.append((f'{path}{key}', "must be a mapping"))
+                reader.skip(event)
+            elif key == 'existing':
+                self._root(reader, 'existing.', violations)
+            else:
+                self._fmc(reader, f'{path}{key}', violations)
+
+    def _fmc(self, reader, path, violations):
+        for key_event in reader.items(MappingEndEvent):
+            key = reader.value(key_event)
+            event = reader.next()
+            if key != 'domains':
+                reader.skip(event)
+            elif type(event) is SequenceStartEvent:
+                for index, domain_event in enumerate(reader.items(SequenceEndEvent)):
+                    self._domain(reader, domain_event, f'{path}.domains[{index}]', violations)
+            else:
+                violations.append((f'{path}.domains', "must be a list"))
+                reader.skip(event)
+
+    def _domain(self, reader, event, path, violations):
+        if type(event) is not MappingStartEvent:
+            violations.append((path, "must be a mapping"))
+            reader.skip(event)
+            return
+        for key_event in reader.items(MappingEndEvent):
+            key = reader.value(key_event)
+            event = reader.next()
+            if key not in SECTIONS:
+                reader.skip(event)
+            elif type(event) is MappingStartEvent:
+                for type_event in reader.items(MappingEndEvent):
+                    record_type = reader.value(type_event)
+                    self._records(reader, reader.next(), record_type, f'{path}.{key}.{record_type}', violations)
+            else:
+                violations.append((f'{path}.{key}', "must be a mapping"))
+                reader.skip(event)
+
+    def _records(self, reader, event, record_type, path, violations, kept_field=None, first_index=0):
+        """Check every record of a list, returns the kept_field values of the records if requested"""
+        check = self.checks.get(record_type)
+        if type(event) is not SequenceStartEvent:
+            violations.append((path, "must be a list"))
+            reader.skip(event)
+            return None
+        kept = []
+        for index, item_event in enumerate(reader.items(SequenceEndEvent), first_index):
+            record_path = f'{path}[{index}]'
+            record, cut_fields = self._record(reader, item_event, record_type, record_path, violations)
+            if cut_fields:
+                # Record checks need the items of the cut sequences, they run after merging
+                check(record, record_path, violations, record_checks=False)
+                self.deferred.append((record_type, record_path, record, cut_fields, len(violations)))
+            elif check:
+                check(record, record_path, violations)
+            if kept_field:
+                kept.append(record.get(kept_field) if isinstance(record, dict) else None)
+        return kept
+
+    def _record(self, reader, event, record_type, path, violations):
+        """
+        Build one record, validating streamed record lists item by item.
+        Returns the record and the cut sequences met in an outline as (field, sequence, position).
+        """
+        self.records += 1
+        streamed = self.streamed.get(record_type)
+        if not streamed or type(event) is not MappingStartEvent:
+            return reader.value(event), None
+
+        record = {}
+        cut_fields = []
+        for key_event in reader.items(MappingEndEvent):
+            key = reader.value(key_event)
+            event = reader.next()
+            if key in streamed:
+                item_type, kept_field = streamed[key]
+                if self.deferred is not None and type(event) is ScalarEvent and event.tag == CHUNKED_TAG:
+                    cut_fields.append((key, int(event.value), len(violations)))
+                    record[key] = []
+                    continue
+                # Only the item field needed by the checks of this record is kept
+                record[key] = self._records(reader, event, item_type, f'{path}.{key}', violations, kept_field)
+            else:
+                record[key] = reader.value(event)
+        return record, cut_fields
+
+
+_validator = None
+
+
+def _get_validator():
+    global _validator
+    if _validator is None:
+        _validator = FileValidator()
+    return _validator
+
+
+def validate_file(path):
+    """
+    Validate one file with a per-process validator (process pool entry point).
+
+    Returns:
+        (path, records, violations)
+    """
+    records, violations = _get_validator().validate(path)
+    return str(path), records, violations
+
+
+def _cut_fields():
+    """Return {streamed field name: (item type, kept field)} of fields that can be cut unambiguously"""
+    fields = {}
+    ambiguous = set()
+    for spec in streamed_fields().values():
+        for field, item in spec.items():
+            if fields.get(field, item) != item:
+                ambiguous.add(field)
+            fields[field] = item
+    return {field: item for field, item in fields.items() if field not in ambiguous}
+
+
+def _item_count(data, start, end, indent):
+    """Count the block sequence items at indent between two line starts"""
+    text = data[start - 1:end] if start else b'\n' + data[:end]
+    prefix = b'\n' + b' ' * indent + b'-'
+    return text.count(prefix + b' ') + text.count(prefix + b'\n') + text.count(prefix + b'\r\n')
+
+
+def plan_chunks(path, chunk_bytes=CHUNK_BYTES):
+    """
+    Find the block sequences of streamed record lists in a file and cut them into
+    chunks of about chunk_bytes at item boundaries.
+
+    Only literal searches and patterns starting with a newline are used, so
+    planning scans a large file in a fraction of the time validating it takes.
+
+    Returns:
+        List of (field, key_end, sequence_end, chunks) per cut sequence, key_end being
+        the offset after the colon of the key and chunks a list of (start, end, first_index)
+    """
+    fields = _cut_fields()
+    key_rest = re.compile(rb'[ \t]*(?:#[^\n]*)?\r?\n')
+    first_item = re.compile(rb'(?:[ \t]*(?:#[^\n]*)?\r?\n)*( *)-(?: |\r?\n)')
+
+    sequences = []
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        keys = []
+        for field in fields:
+            key = field.encode() + b':'
+            position = data.find(key)
+            while position >= 0:
+                line_start = data.rfind(b'\n', 0, position) + 1
+                rest = key_rest.match(data, position + len(key))
+                # Keys holding flow sequences or nothing inline, at the start of their line
+                if rest and data[line_start:position].strip(b' ') == b'':
+                    keys.append((position, field, position - line_start, position + len(key), rest.end()))
+                position = data.find(key, position + len(key))
+
+        position = 0
+        for key_start, field, key_indent, key_end, line_end in sorted(keys):
+            if key_start < position:
+                continue
+            first = first_item.match(data, line_end)
+            if not first or len(first.group(1)) < key_indent:
+                continue
+            indent = len(first.group(1))
+            start = first.start(1)
+            # The sequence ends at the first line that is neither an item, item content, blank nor a comment
+            end_pattern = re.compile(rb'\n(?! {%d}-(?: |\r?\n)| {%d}| *(?:#|\r?\n|$))' % (indent, indent + 1))
+            end_match = end_pattern.search(data, start)
+            end = end_match.end() if end_match else len(data)
+            item_start = b'\n' + b' ' * indent + b'-'
+            chunks = []
+            index = 0
+            # Chunks start at a line start, so they parse as a sequence at the item indentation
+            chunk_start = start
+            while chunk_start < end:
+                chunk_end = end
+                boundary = data.find(item_start, chunk_start + chunk_bytes, end)
+                while boundary >= 0 and data[boundary + len(item_start):boundary + len(item_start) + 1] not in (b' ', b'\n', b'\r'):
+                    boundary = data.find(item_start, boundary + 1, end)
+                if boundary >= 0:
+                    chunk_end = boundary + 1
+                chunks.append((chunk_start, chunk_end, index))
+                index += _item_count(data, chunk_start, chunk_end, indent)
+                chunk_start = chunk_end
+            sequences.append((field, key_end, end, chunks))
+            position = end
+    return sequences
+
+
+def _outline(path, sequences):
+    """Return the file content with every cut sequence replaced by a placeholder"""
+    parts = []
+    position = 0
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for number, (_, key_end, end, _) in enumerate(sequences):
+            parts.append(data[position:key_end])
+            parts.append(f' {CHUNKED_TAG} {number}\n'.encode())
+            position = end
+        parts.append(data[position:])
+    return b''.join(parts)
+
+
+def _validate_outline(path, sequences):
+    """Validate the outline of a cut file (process pool entry point)"""
+    return _get_validator().validate_outline(_outline(path, sequences))
+
+
+def _validate_chunk(path, start, end, item_type, kept_field, first_index):
+    """Validate one chunk of a cut sequence (process pool entry point)"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return _get_validator().validate_items(data, item_type, kept_field, first_index)
+
+
+def _merge(outline, sequences, chunk_results):
+    """
+    Merge the outline and chunk results of a cut file into file order.
+    Returns (records, violations), or None if the file has to be validated in one piece.
+    """
+    records, violations, deferred, ok = outline
+    if not ok or not all(result[3] for results in chunk_results for result in results):
+        return None
+    fields = _cut_fields()
+    validator = _get_validator()
+
+    inserts = []
+    seen = []
+    for record_type, record_path, record, cut_fields, check_position in deferred:
+        for field, sequence, position in cut_fields:
+            # The placeholder must sit in the field the chunks were validated as
+            if sequence >= len(sequences) or sequences[sequence][0] != field:
+                return None
+            if validator.streamed.get(record_type, {}).get(field) != fields.get(field):
+                return None
+            seen.append(sequence)
+            kept = []
+            found = []
+            for chunk_records, chunk_violations, chunk_kept, _ in chunk_results[sequence]:
+                records += chunk_records
+                kept.extend(chunk_kept)
+                found.extend((f'{record_path}.{field}{path}', message) for path, message in chunk_violations)
+            record[field] = kept
+            inserts.append((position, found))
+        found = []
+        validator.checks[record_type].record_checks(record, record_path, found)
+        inserts.append((check_position, found))
+    # Every cut sequence must have been met exactly once in the outline
+    if sorted(seen) != list(range(len(sequences))):
+        return None
+
+    merged = []
+    position = 0
+    for insert_position, found in sorted(inserts, key=lambda insert: insert[0]):
+        merged.extend(violations[position:insert_position])
+        merged.extend(found)
+        position = insert_position
+    merged.extend(violations[position:])
+    return records, merged
+
+
+def validate_files(paths, workers=None, chunk_bytes=CHUNK_BYTES):
+    """
+    Validate files on a process pool, cutting large record lists into chunks.
+
+    Args:
+        paths: Files to validate
+        workers: Number of processes (defaults to the CPU count)
+        chunk_bytes: Chunk size of cut record lists (0 validates every file in one piece)
+
+    Returns:
+        List of (path, records, violations) in the order of paths
+    """
+    fields = _cut_fields()
+    # Largest files first so a big file does not start last
+    order = sorted(range(len(paths)), key=lambda i: os.path.getsize(paths[i]), reverse=True)
+    results = [None] * len(paths)
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        whole = {}
+        planned = {}
+        for i in order:
+            if chunk_bytes and os.path.getsize(paths[i]) >= 2 * chunk_bytes:
+                planned[i] = executor.submit(plan_chunks, paths[i], chunk_bytes)
+            else:
+                whole[i] = executor.submit(validate_file, paths[i])
+
+        cut = {}
+        for i, future in planned.items():
+            sequences = future.result()
+            if not sequences:
+                whole[i] = executor.submit(validate_file, paths[i])
+                continue
+            chunks = [
+                [
+                    executor.submit(_validate_chunk, paths[i], start, end, *fields[field], first_index)
+                    for start, end, first_index in sequence_chunks
+                ]
+                for field, _, _, sequence_chunks in sequences
+            ]
+            cut[i] = (sequences, executor.submit(_validate_outline, paths[i], sequences), chunks)
+
+        for i, (sequences, outline, chunks) in cut.items():
+            merged = _merge(outline.result(), sequences, [[chunk.result() for chunk in sequence] for sequence in chunks])
+            if merged is None:
+                # Read errors are reported against the file in one piece
+                whole[i] = executor.submit(validate_file, paths[i])
+            else:
+                results[i] = (str(paths[i]), *merged)
+
+        for i, future in whole.items():
+            results[i] = future.result()
+
+    return results
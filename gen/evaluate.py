@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+FMC Access Control Policy Evaluator
+Compiles generated access control policies and benchmarks first-match lookups
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+
+from utils.file_ops import load_fmc_data
+from analysis.resolve import ObjectResolver, load_policies
+from analysis.engine import CompiledClassifier, LinearClassifier, synthetic_packets
+
+
+def evaluate_policy(policy, resolver, zones, args):
+    spaces = resolver.policy_spaces(policy)
+    packets = synthetic_packets(spaces, zones, args.packets, args.seed)
+
+    started = time.perf_counter()
+    compiled = CompiledClassifier(spaces)
+    compile_seconds = time.perf_counter() - started
+
+    with_urls = sum(1 for space in spaces if space.urls is not None)
+    monitors = sum(1 for space in spaces if space.urls is None and space.action == 'MONITOR')
+    print(f"Policy {policy['name']}: {len(spaces)} rules "
+          f"({with_urls} with URL conditions and {monitors} MONITOR rules skipped)")
+    intervals = ', '.join(f"{name} {count}" for name, count in compiled.elementary_intervals.items())
+    print(f"  Compiled in {compile_seconds:.3f}s, elementary intervals: {intervals}")
+
+    started = time.perf_counter()
+    results = compiled.match_batch(packets)
+    compiled_seconds = time.perf_counter() - started
+    print(f"  Compiled: {len(packets)} packets in {compiled_seconds:.3f}s "
+          f"({len(packets) / compiled_seconds:,.0f} packets/s)")
+
+    mismatches = 0
+    if not args.no_baseline:
+        # The linear scan is slow on large policies, so the oracle may use a prefix of the batch
+        baseline_packets = packets[:args.baseline_packets] if args.baseline_packets else packets
+        linear = LinearClassifier(spaces)
+        started = time.perf_counter()
+        expected = linear.match_batch(baseline_packets)
+        linear_seconds = time.perf_counter() - started
+        print(f"  Linear:   {len(baseline_packets)} packets in {linear_seconds:.3f}s "
+              f"({len(baseline_packets) / linear_seconds:,.0f} packets/s)")
+
+        mismatches = sum(1 for got, want in zip(results, expected) if got != want)
+        speedup = (linear_seconds / len(baseline_packets)) / (compiled_seconds / len(packets))
+        print(f"  Speedup {speedup:.1f}x, mismatches against linear scan: {mismatches}")
+
+    hits = Counter(results)
+    unmatched = hits.pop(None, 0)
+    print(f"  Default action ({policy.get('default_action')}): {unmatched} packets")
+    rules = policy.get('access_rules', [])
+    for index, count in hits.most_common(args.top):
+        print(f"  {rules[index]['name']:<24} {rules[index]['action']:<18} {count} packets")
+
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark first-match evaluation of generated access control policies")
+    parser.add_argument('--policy', action='append', help="Policy name (repeatable, default: all policies)")
+    parser.add_argument('--packets', type=int, default=100000, help="Synthetic packets per policy")
+    parser.add_argument('--baseline-packets', type=int, default=0,
+                        help="Packets checked with the linear scan (default: all)")
+    parser.add_argument('--no-baseline', action='store_true', help="Skip the linear scan oracle")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for synthetic packets")
+    parser.add_argument('--top', type=int, default=5, help="Number of most hit rules to show")
+    args = parser.parse_args()
+
+    print("FMC Access Control Policy Evaluator")
+    print("=" * 50)
+
+    domains = load_fmc_data()
+    policies = load_policies(domains)
+    if not policies:
+        print("Error: no access control policies found in data folder", file=sys.stderr)
+        sys.exit(1)
+
+    names = args.policy or list(policies)
+    missing = [name for name in names if name not in policies]
+    if missing:
+        print(f"Error: unknown policies: {', '.join(missing)}", file=sys.stderr)
+        sys.exit(1)
+
+    resolver = ObjectResolver(domains)
+    zones = [name for name, (object_type, _) in resolver.objects.items() if object_type == 'security_zones']
+
+    mismatches = 0
+    try:
+        for name in names:
+            mismatches += evaluate_policy(policies[name], resolver, zones, args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print("=" * 50)
+    if mismatches:
+        print(f"Compiled engine disagreed with the linear scan on {mismatches} packets", file=sys.stderr)
+        sys.exit(1)
+    print("Evaluation completed successfully!")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,336 @@
+"""
+Pooled FMC REST API client with rate-limit-aware pacing and retry
+"""
+
+import base64
+import http.client
+import json
+import queue
+import ssl
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+
+# Largest number of objects FMC accepts in one bulk request
+FMC_MAX_BULK_SIZE = 1000
+
+# Server errors that are retried for idempotent methods
+SERVER_ERROR_STATUSES = [500, 502, 503, 504]
+
+# Methods that are safe to send again after the outcome of an attempt is unknown
+IDEMPOTENT_METHODS = ['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS']
+
+# First pause after HTTP 429 in seconds, doubled on every further 429
+THROTTLE_DELAY = 5.0
+
+AUTH_PATH = '/api/fmc_platform/v1/auth/generatetoken'
+
+
+class FmcApiError(Exception):
+    """Raised when FMC rejects a request or retries are exhausted"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class NotSentError(Exception):
+    """Raised when a connection fails before any part of the request was sent"""
+
+
+def retry_after(headers, default):
+    """
+    Return the delay requested by a Retry-After header in seconds.
+
+    Args:
+        headers: Response headers
+        default: Delay used when the header is missing or cannot be parsed
+    """
+    value = headers.get('Retry-After')
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    # The header may also be an HTTP date
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateLimiter:
+    """
+    Token bucket pacing requests below the FMC requests-per-minute cap.
+
+    Args:
+        requests_per_minute: Sustained request rate (0 disables pacing)
+        burst: Requests that may be sent back to back before pacing starts
+    """
+
+    def __init__(self, requests_per_minute, burst=1):
+        self.rate = requests_per_minute / 60.0
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        # A pause after HTTP 429 applies even when pacing is disabled
+        if self.rate <= 0:
+            while True:
+                with self._lock:
+                    wait = self._paused_until - time.monotonic()
+                if wait <= 0:
+                    return
+                time.sleep(wait)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Stop all requests for a while, used after FMC answers 429"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class ConnectionPool:
+    """
+    Fixed size pool of keep-alive HTTP(S) connections to one host.
+
+    Args:
+        url: Base URL of the FMC (http:// or https://)
+        size: Maximum number of open connections
+        timeout: Socket timeout in seconds
+        verify_ssl: Verify the FMC certificate (FMCs often use self-signed ones)
+    """
+
+    def __init__(self, url, size, timeout=60, verify_ssl=False):
+        parts = urlsplit(url)
+        self.scheme = parts.scheme or 'https'
+        self.host = parts.hostname
+        self.port = parts.port
+        self.timeout = timeout
+        self._context = None
+        if self.scheme == 'https':
+            self._context = ssl.create_default_context()
+            if not verify_ssl:
+                self._context.check_hostname = False
+                self._context.verify_mode = ssl.CERT_NONE
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self):
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout, context=self._context)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def acquire(self):
+        """Take an idle connection or open a new one, blocking while all are in use"""
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, connection, reusable=True):
+        """Return a connection to the pool, closing it if it cannot be reused"""
+        if reusable:
+            self._idle.put(connection)
+        else:
+            connection.close()
+        self._slots.release()
+
+    def close(self):
+        """Close all idle connections"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class FmcClient:
+    """
+    Minimal FMC REST API client for bulk object creation.
+
+    Args:
+        url: Base URL of the FMC
+        username: API username
+        password: API password
+        concurrency: Maximum number of requests in flight
+        requests_per_minute: Request pacing rate (FMC allows 120 per minute per user)
+        burst: Requests allowed back to back before pacing starts
+        retries: Attempts per request after the first one
+        timeout: Socket timeout in seconds
+        verify_ssl: Verify the FMC certificate
+    """
+
+    def __init__(self, url, username, password, concurrency=4, requests_per_minute=110, burst=10,
+                 retries=5, timeout=60, verify_ssl=False):
+        self.username = username
+        self.password = password
+        self.retries = retries
+        self.pool = ConnectionPool(url, concurrency, timeout, verify_ssl)
+        self.limiter = RateLimiter(requests_per_minute, burst)
+        self.domains = {}
+        self._token = None
+        self._token_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {'requests': 0, 'retries': 0, 'throttled': 0}
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _send(self, method, path, body, headers):
+        """
+        Send one request on a pooled connection.
+        Raises NotSentError when the connection could not be opened, so nothing was sent.
+        """
+        self.limiter.acquire()
+        self._count('requests')
+        connection = self.pool.acquire()
+        reusable = False
+        try:
+            if connection.sock is None:
+                try:
+                    connection.connect()
+                except OSError as e:
+                    raise NotSentError(str(e)) from e
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+            reusable = not response.will_close
+            return response.status, response.headers, data
+        finally:
+            self.pool.release(connection, reusable)
+
+    def authenticate(self):
+        """Request an access token and the list of domains"""
+        credentials = base64.b64encode(f'{self.username}:{self.password}'.encode()).decode()
+        status, headers, _ = self._exchange('POST', AUTH_PATH, b'', {'Authorization': f'Basic {credentials}'})
+        if status not in [200, 204]:
+            raise FmcApiError(f"Authentication failed with HTTP {status}", status)
+
+        self._token = headers.get('X-auth-access-token')
+        self.domains = {d['name']: d['uuid'] for d in json.loads(headers.get('DOMAINS') or '[]')}
+        if 'Global' not in self.domains and headers.get('DOMAIN_UUID'):
+            self.domains['Global'] = headers.get('DOMAIN_UUID')
+
+    def domain_uuid(self, name):
+        """Return the UUID of a domain by name"""
+        if name not in self.domains:
+            raise FmcApiError(f"Domain '{name}' does not exist on the FMC")
+        return self.domains[name]
+
+    def _exchange(self, method, path, body, headers=None):
+        """
+        Send a request, retrying it while that is safe, with one retry budget for all causes.
+
+        HTTP 429 and connections that failed before anything was sent are always
+        retried. Server errors and connections lost after sending are retried only
+        for idempotent methods: FMC may have committed a bulk POST whose response
+        was lost, and sending it again fails on duplicate names. Without headers
+        the request is authenticated with the access token, re-authenticating
+        once if it expired.
+        Returns the status, headers and body of the last attempt.
+        """
+        idempotent = method in IDEMPOTENT_METHODS
+        delay = 1.0
+        throttled = 0
+        reauthenticated = False
+
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            request_headers = headers
+            if headers is None:
+                request_headers = {'Content-Type': 'application/json', 'X-auth-access-token': self._token or ''}
+
+            try:
+                status, response_headers, data = self._send(method, path, body, request_headers)
+            except NotSentError as e:
+                if last:
+                    raise FmcApiError(f"{method} {path} failed: {e}") from e
+                self._count('retries')
+                time.sleep(delay)
+                delay = min(delay * 2, 30)
+                continue
+            except (OSError, http.client.HTTPException) as e:
+                if last or not idempotent:
+                    raise FmcApiError(f"{method} {path} failed: {e}") from e
+                self._count('retries')
+                time.sleep(delay)
+                delay = min(delay * 2, 30)
+                continue
+
+            if last:
+                return status, response_headers, data
+
+            if status == 429:
+                self._count('retries')
+                self._count('throttled')
+                # The cap is per user and per minute, so every thread backs off for longer
+                throttle_delay = min(THROTTLE_DELAY * 2 ** throttled, 60)
+                throttled += 1
+                self.limiter.pause(retry_after(response_headers, throttle_delay))
+                continue
+
+            if status in SERVER_ERROR_STATUSES and idempotent:
+                self._count('retries')
+                time.sleep(retry_after(response_headers, delay))
+                delay = min(delay * 2, 30)
+                continue
+
+            if status == 401 and headers is None and not reauthenticated:
+                # Token expired, re-authenticate once for all threads
+                with self._token_lock:
+                    if request_headers['X-auth-access-token'] == (self._token or ''):
+                        self.authenticate()
+                reauthenticated = True
+                self._count('retries')
+                continue
+
+            return status, response_headers, data
+
+    def request(self, method, path, payload=None):
+        """
+        Send an authenticated JSON request, retrying it while that is safe.
+        Returns the decoded JSON response.
+        """
+        body = json.dumps(payload).encode() if payload is not None else None
+        status, _, data = self._exchange(method, path, body)
+        if status >= 400:
+            raise FmcApiError(f"{method} {path} failed with HTTP {status}: {data[:500].decode(errors='replace')}", status)
+        return json.loads(data) if data else {}
+
+    def bulk_create(self, domain_uuid, endpoint, payloads):
+        """
+        Create objects with one bulk POST.
+        Returns the created objects as reported by FMC (including their ids).
+        """
+        if len(payloads) > FMC_MAX_BULK_SIZE:
+            raise ValueError(f"Bulk requests are limited to {FMC_MAX_BULK_SIZE} objects")
+        path = f'/api/fmc_config/v1/domain/{domain_uuid}/object/{endpoint}?bulk=true'
+        return self.request('POST', path, payloads).get('items', [])
+
+    def close(self):
+        """Close pooled connections"""
+        self.pool.close()
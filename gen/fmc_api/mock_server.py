@@ -0,0 +1,189 @@
+"""
+Local mock FMC server for offline push benchmarks
+
+Implements token authentication and the bulk object endpoints used by the push
+tool. Every request sleeps for a configurable latency, and requests above the
+per-minute cap are answered with HTTP 429 like a real FMC.
+"""
+
+import json
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from fmc_api.client import AUTH_PATH, FMC_MAX_BULK_SIZE
+from fmc_api.payloads import OBJECT_ENDPOINTS
+
+
+# Well known UUID of the Global domain
+GLOBAL_DOMAIN_UUID = 'e276abec-e0f2-11e3-8169-6d9ed49b625f'
+
+OBJECT_PATH = re.compile(r'^/api/fmc_config/v1/domain/([^/]+)/object/([a-z0-9]+)$')
+
+# API types accepted by each endpoint
+ENDPOINT_TYPES = {endpoint: api_type for endpoint, api_type in OBJECT_ENDPOINTS.values()}
+
+
+class MockFmcState:
+    """
+    Shared state of the mock server: tokens, domains, created objects and the rate window.
+
+    Args:
+        latency: Base latency of every request in seconds
+        per_object_latency: Extra latency per object in a bulk request in seconds
+        requests_per_minute: Request cap per sliding minute (0 disables the cap)
+        domains: Domain names to expose (Global is always present)
+    """
+
+    def __init__(self, latency=0.05, per_object_latency=0.0005, requests_per_minute=120, domains=()):
+        self.latency = latency
+        self.per_object_latency = per_object_latency
+        self.requests_per_minute = requests_per_minute
+        self.domains = {'Global': GLOBAL_DOMAIN_UUID}
+        for name in domains:
+            self.domains.setdefault(name, str(uuid.uuid5(uuid.NAMESPACE_DNS, name)))
+        self.tokens = set()
+        self.objects = {}
+        self.requests = 0
+        self.throttled = 0
+        self._window = deque()
+        self._lock = threading.Lock()
+
+    def admit(self):
+        """Record a request, returning False when it exceeds the per-minute cap"""
+        with self._lock:
+            self.requests += 1
+            if not self.requests_per_minute:
+                return True
+            now = time.monotonic()
+            while self._window and now - self._window[0] >= 60:
+                self._window.popleft()
+            if len(self._window) >= self.requests_per_minute:
+                self.throttled += 1
+                return False
+            self._window.append(now)
+            return True
+
+    def issue_token(self):
+        """Create a new access token"""
+        token = str(uuid.uuid4())
+        with self._lock:
+            self.tokens.add(token)
+        return token
+
+    def create(self, domain_uuid, items):
+        """Store objects and assign ids, rejecting references to unknown objects"""
+        with self._lock:
+            for item in items:
+                for ref in item.get('objects', []):
+                    if ref.get('id') not in self.objects:
+                        raise ValueError(f"Referenced object id '{ref.get('id')}' does not exist")
+            created = []
+            for item in items:
+                obj = dict(item, id=str(uuid.uuid4()))
+                obj['metadata'] = {'domain': {'id': domain_uuid}}
+                self.objects[obj['id']] = obj
+                created.append(obj)
+            return created
+
+
+class MockFmcHandler(BaseHTTPRequestHandler):
+    """Request handler implementing the FMC endpoints used by the push tool"""
+
+    protocol_version = 'HTTP/1.1'
+    state = None
+
+    def log_message(self, format, *args):
+        # Benchmarks would be dominated by access logging
+        pass
+
+    def _reply(self, status, payload=None, headers=None):
+        body = json.dumps(payload).encode() if payload is not None else b''
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._reply(status, {'error': {'category': 'FRAMEWORK', 'messages': [{'description': message}]}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        state = self.state
+
+        if not state.admit():
+            self._error(429, 'Too many requests')
+            return
+
+        parts = urlsplit(self.path)
+
+        if parts.path == AUTH_PATH:
+            token = state.issue_token()
+            time.sleep(state.latency)
+            domains = [{'name': name, 'uuid': domain_uuid} for name, domain_uuid in state.domains.items()]
+            self._reply(204, headers={
+                'X-auth-access-token': token,
+                'X-auth-refresh-token': str(uuid.uuid4()),
+                'DOMAIN_UUID': GLOBAL_DOMAIN_UUID,
+                'DOMAINS': json.dumps(domains)
+            })
+            return
+
+        if self.headers.get('X-auth-access-token') not in state.tokens:
+            self._error(401, 'Access token invalid')
+            return
+
+        match = OBJECT_PATH.match(parts.path)
+        if not match or match.group(2) not in ENDPOINT_TYPES:
+            self._error(404, f'Unknown endpoint {parts.path}')
+            return
+
+        domain_uuid, endpoint = match.groups()
+        if domain_uuid not in state.domains.values():
+            self._error(404, f'Unknown domain {domain_uuid}')
+            return
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self._error(400, 'Invalid JSON body')
+            return
+
+        bulk = parse_qs(parts.query).get('bulk') == ['true']
+        items = payload if bulk else [payload]
+        if not isinstance(items, list) or len(items) > FMC_MAX_BULK_SIZE:
+            self._error(400, f'Bulk requests must be a list of at most {FMC_MAX_BULK_SIZE} objects')
+            return
+        for item in items:
+            if item.get('type') != ENDPOINT_TYPES[endpoint] or not item.get('name'):
+                self._error(400, f"Objects posted to {endpoint} need a name and type {ENDPOINT_TYPES[endpoint]}")
+                return
+
+        time.sleep(state.latency + state.per_object_latency * len(items))
+
+        try:
+            created = state.create(domain_uuid, items)
+        except ValueError as e:
+            self._error(400, str(e))
+            return
+
+        self._reply(201, {'items': created} if bulk else created[0])
+
+
+def create_mock_server(host='127.0.0.1', port=8443, **state_options):
+    """
+    Create (but do not start) a mock FMC HTTP server.
+    Keyword arguments are passed to MockFmcState.
+    """
+    handler = type('BoundMockFmcHandler', (MockFmcHandler,), {'state': MockFmcState(**state_options)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
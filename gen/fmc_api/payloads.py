@@ -0,0 +1,130 @@
+"""
+Conversion of nac-fmc objects into FMC REST API payloads
+"""
+
+
+# FMC object endpoint (under /object/) and API type for each nac-fmc object type
+OBJECT_ENDPOINTS = {
+    'hosts': ('hosts', 'Host'),
+    'networks': ('networks', 'Network'),
+    'ranges': ('ranges', 'Range'),
+    'ports': ('protocolportobjects', 'ProtocolPortObject'),
+    'icmpv4s': ('icmpv4objects', 'ICMPV4Object'),
+    'security_zones': ('securityzones', 'SecurityZone'),
+    'urls': ('urls', 'Url'),
+    'port_groups': ('portobjectgroups', 'PortObjectGroup'),
+    'url_groups': ('urlgroups', 'UrlGroup'),
+    'network_groups': ('networkgroups', 'NetworkGroup'),
+}
+
+# Object types without references to other objects, pushed first
+INDEPENDENT_OBJECT_TYPES = ['hosts', 'networks', 'ranges', 'ports', 'icmpv4s', 'security_zones', 'urls']
+
+
+def _reference(refs, name):
+    """Return the {id, type, name} reference of an already created object"""
+    try:
+        return refs[name]
+    except KeyError:
+        raise ValueError(f"Object '{name}' is referenced before it was created") from None
+
+
+def build_payload(object_type, obj, refs):
+    """
+    Build the FMC API payload for one nac-fmc object.
+
+    Args:
+        object_type: nac-fmc object type (key of OBJECT_ENDPOINTS)
+        obj: Object as found in the generated YAML
+        refs: Dict of object name -> {id, type, name} for objects already created
+    """
+    api_type = OBJECT_ENDPOINTS[object_type][1]
+    payload = {'name': obj['name'], 'type': api_type}
+
+    if object_type == 'hosts':
+        payload['value'] = obj['ip']
+    elif object_type == 'networks':
+        payload['value'] = obj['prefix']
+    elif object_type == 'ranges':
+        payload['value'] = obj['ip_range']
+    elif object_type == 'ports':
+        payload['protocol'] = obj['protocol']
+        if 'port' in obj:
+            payload['port'] = str(obj['port'])
+    elif object_type == 'icmpv4s':
+        payload['icmpType'] = str(obj['icmp_type'])
+        payload['code'] = obj['code']
+    elif object_type == 'security_zones':
+        payload['interfaceMode'] = obj['interface_type']
+    elif object_type == 'urls':
+        payload['url'] = obj['url']
+    elif object_type in ['port_groups', 'network_groups']:
+        payload['objects'] = [_reference(refs, name) for name in obj.get('objects', [])]
+    elif object_type == 'url_groups':
+        payload['objects'] = [_reference(refs, name) for name in obj.get('urls', [])]
+        payload['literals'] = [{'type': 'Url', 'url': url} for url in obj.get('literals', [])]
+
+    return payload
+
+
+def network_group_levels(network_groups):
+    """
+    Split network groups into levels that can be pushed in order.
+    A group only references groups from earlier levels.
+    """
+    by_name = {group['name']: group for group in network_groups}
+    depth = {}
+    visiting = set()
+
+    for group in network_groups:
+        # Iterative DFS, generated groups only nest earlier groups but inputs may be in any order
+        stack = [(group['name'], False)]
+        while stack:
+            name, expanded = stack.pop()
+            if name in depth:
+                continue
+            children = [child for child in by_name[name].get('objects', []) if child in by_name]
+            if expanded:
+                visiting.discard(name)
+                depth[name] = 1 + max((depth[child] for child in children), default=-1)
+                continue
+            if name in visiting:
+                raise ValueError(f"Network group '{name}' is part of a reference cycle")
+            visiting.add(name)
+            stack.append((name, True))
+            for child in children:
+                if child not in depth:
+                    stack.append((child, False))
+
+    levels = []
+    for group in network_groups:
+        level = depth[group['name']]
+        while len(levels) <= level:
+            levels.append([])
+        levels[level].append(group)
+    return levels
+
+
+def push_plan(objects):
+    """
+    Order objects of one domain into push stages.
+
+    Returns a list of stages; each stage is a list of (object_type, objects) that
+    only reference objects created in earlier stages.
+    """
+    plan = []
+
+    independent = [(t, objects[t]) for t in INDEPENDENT_OBJECT_TYPES if objects.get(t)]
+    if independent:
+        plan.append(independent)
+
+    levels = network_group_levels(objects.get('network_groups', []))
+    first_groups = [(t, objects[t]) for t in ['port_groups', 'url_groups'] if objects.get(t)]
+    if levels:
+        first_groups.append(('network_groups', levels[0]))
+    if first_groups:
+        plan.append(first_groups)
+    for level in levels[1:]:
+        plan.append([('network_groups', level)])
+
+    return plan
@@ -4,8 +4,17 @@ FMC YAML Configuration Generator
 Generates YAML files for nac-fmc Terraform module
 """
 
-from utils.config import load_config, parse_config
-from utils.file_ops import clear_data_folder, write_output, create_fmc_structure, create_fmc_policy_structure
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.config import load_config, parse_config, parse_workload_profile
+from utils.domains import parse_domains
+from utils.pruning import PRUNABLE_TYPES, prune_objects
+from utils.file_ops import clear_data_folder, write_output, write_json, create_fmc_structure, create_fmc_policy_structure
+from utils.layout import POLICY_LAYOUTS, split_policy, policy_index
+from utils.writer import OutputWriter
 from generators.network_objects import generate_hosts, generate_networks, generate_ranges
 from generators.service_objects import generate_ports, generate_icmpv4s, generate_port_groups
 from generators.url_objects import generate_urls, generate_url_groups
@@ -18,40 +27,69 @@ from generators.policy_objects import (
 )
 
 
-def main():
-    print("FMC YAML Configuration Generator")
-    print("=" * 50)
+def generate_domain(domain, profile=None, multi_domain=False):
+    """
+    Generate all objects and policies of one domain and write them to the data folder.
 
-    # Load configuration
-    config = load_config()
-    settings = parse_config(config)
+    Args:
+        domain: Domain spec from parse_domains (path, settings, prefix, file_suffix, seed, inherited,
+                inherited_by_children)
+        profile: Optional WorkloadProfile
+        multi_domain: Prefix progress output with the domain path
+    """
+    settings = domain['settings']
+    path = domain['path']
+    prefix = domain['prefix']
+    file_suffix = domain['file_suffix']
+    inherited = domain['inherited']
+    tag = f"[{path}] " if multi_domain else ""
 
-    # Clear data folder
-    clear_data_folder()
+    if domain['seed'] is not None:
+        random.seed(domain['seed'])
+
+    # Serialize and write files on worker processes while the next stage generates
+    writer = OutputWriter(
+        processes=settings.get('writer_processes', 2),
+        queue_bytes=settings.get('writer_queue_mb', 256) * 1024 * 1024
+    )
+
+    # Unused objects can only be pruned when no child domain may reference them
+    prune = settings.get('prune_unused_objects', False) and not domain['inherited_by_children']
+    if settings.get('prune_unused_objects', False) and not prune:
+        print(f"{tag}Objects are inherited by child domains, skipping pruning")
+
+    # With pruning, prunable objects are held back until the access rules referencing them exist
+    deferred = {}
 
-    # Track all available object names for network groups
-    available_objects = []
+    def output(object_type, items):
+        if prune and object_type in PRUNABLE_TYPES:
+            deferred[object_type] = items
+        else:
+            fmc_data = create_fmc_structure(object_type, items, path)
+            writer.submit(fmc_data, f'{object_type}{file_suffix}.nac.yaml')
+
+    # Track all available object names for network groups (starting with inherited ones)
+    available_objects = list(inherited['network'])
 
     # Track available port/icmpv4 object names for port groups
-    available_port_objects = []
+    available_port_objects = list(inherited['port'])
 
     # Track available URL object names for URL groups
-    available_url_objects = []
+    available_url_objects = list(inherited['url'])
 
     # Track available security zone names for access control policies
-    available_security_zones = []
+    available_security_zones = list(inherited['zone'])
 
     # Track available intrusion policy names for access control policies
-    available_intrusion_policies = []
+    available_intrusion_policies = list(inherited['intrusion'])
 
     # Generate hosts
     if 'hosts_number' in settings:
         hosts_number = settings['hosts_number']
         if hosts_number > 0:
-            print(f"Generating {hosts_number} host(s)...")
-            hosts = generate_hosts(hosts_number)
-            fmc_data = create_fmc_structure('hosts', hosts)
-            write_output(fmc_data, 'hosts.nac.yaml')
+            print(f"{tag}Generating {hosts_number} host(s)...")
+            hosts = generate_hosts(hosts_number, prefix)
+            output('hosts', hosts)
             # Add host names to available objects
             available_objects.extend([h['name'] for h in hosts])
 
@@ -59,10 +97,9 @@ def main():
     if 'networks_number' in settings:
         networks_number = settings['networks_number']
         if networks_number > 0:
-            print(f"Generating {networks_number} network(s)...")
-            networks = generate_networks(networks_number)
-            fmc_data = create_fmc_structure('networks', networks)
-            write_output(fmc_data, 'networks.nac.yaml')
+            print(f"{tag}Generating {networks_number} network(s)...")
+            networks = generate_networks(networks_number, prefix)
+            output('networks', networks)
             # Add network names to available objects
             available_objects.extend([n['name'] for n in networks])
 
@@ -70,10 +107,9 @@ def main():
     if 'ranges_number' in settings:
         ranges_number = settings['ranges_number']
         if ranges_number > 0:
-            print(f"Generating {ranges_number} range(s)...")
-            ranges = generate_ranges(ranges_number)
-            fmc_data = create_fmc_structure('ranges', ranges)
-            write_output(fmc_data, 'ranges.nac.yaml')
+            print(f"{tag}Generating {ranges_number} range(s)...")
+            ranges = generate_ranges(ranges_number, prefix)
+            output('ranges', ranges)
             # Add range names to available objects
             available_objects.extend([r['name'] for r in ranges])
 
@@ -81,10 +117,9 @@ def main():
     if 'ports_number' in settings:
         ports_number = settings['ports_number']
         if ports_number > 0:
-            print(f"Generating {ports_number} port(s)...")
-            ports = generate_ports(ports_number)
-            fmc_data = create_fmc_structure('ports', ports)
-            write_output(fmc_data, 'ports.nac.yaml')
+            print(f"{tag}Generating {ports_number} port(s)...")
+            ports = generate_ports(ports_number, prefix)
+            output('ports', ports)
             # Add port names to available port objects
             available_port_objects.extend([p['name'] for p in ports])
 
@@ -92,10 +127,9 @@ def main():
     if 'icmpv4s_number' in settings:
         icmpv4s_number = settings['icmpv4s_number']
         if icmpv4s_number > 0:
-            print(f"Generating {icmpv4s_number} ICMPv4 object(s)...")
-            icmpv4s = generate_icmpv4s(icmpv4s_number)
-            fmc_data = create_fmc_structure('icmpv4s', icmpv4s)
-            write_output(fmc_data, 'icmpv4s.nac.yaml')
+            print(f"{tag}Generating {icmpv4s_number} ICMPv4 object(s)...")
+            icmpv4s = generate_icmpv4s(icmpv4s_number, prefix)
+            output('icmpv4s', icmpv4s)
             # Add icmpv4 names to available port objects
             available_port_objects.extend([i['name'] for i in icmpv4s])
 
@@ -103,10 +137,9 @@ def main():
     if 'security_zones_number' in settings:
         security_zones_number = settings['security_zones_number']
         if security_zones_number > 0:
-            print(f"Generating {security_zones_number} security zone(s)...")
-            security_zones = generate_security_zones(security_zones_number)
-            fmc_data = create_fmc_structure('security_zones', security_zones)
-            write_output(fmc_data, 'security_zones.nac.yaml')
+            print(f"{tag}Generating {security_zones_number} security zone(s)...")
+            security_zones = generate_security_zones(security_zones_number, prefix)
+            output('security_zones', security_zones)
             # Add security zone names to available security zones
             available_security_zones.extend([sz['name'] for sz in security_zones])
 
@@ -114,10 +147,9 @@ def main():
     if 'urls_number' in settings:
         urls_number = settings['urls_number']
         if urls_number > 0:
-            print(f"Generating {urls_number} URL(s)...")
-            urls = generate_urls(urls_number)
-            fmc_data = create_fmc_structure('urls', urls)
-            write_output(fmc_data, 'urls.nac.yaml')
+            print(f"{tag}Generating {urls_number} URL(s)...")
+            urls = generate_urls(urls_number, prefix)
+            output('urls', urls)
             # Add URL names to available URL objects
             available_url_objects.extend([u['name'] for u in urls])
 
@@ -125,10 +157,9 @@ def main():
     if 'port_groups_number' in settings and len(available_port_objects) > 0:
         port_groups_number = settings['port_groups_number']
         if port_groups_number > 0:
-            print(f"Generating {port_groups_number} port group(s)...")
-            port_groups = generate_port_groups(port_groups_number, available_port_objects)
-            fmc_data = create_fmc_structure('port_groups', port_groups)
-            write_output(fmc_data, 'port_groups.nac.yaml')
+            print(f"{tag}Generating {port_groups_number} port group(s)...")
+            port_groups = generate_port_groups(port_groups_number, available_port_objects, profile, prefix)
+            output('port_groups', port_groups)
             # Add port group names to available port objects
             available_port_objects.extend([pg['name'] for pg in port_groups])
 
@@ -136,10 +167,9 @@ def main():
     if 'network_groups_number' in settings and len(available_objects) > 0:
         network_groups_number = settings['network_groups_number']
         if network_groups_number > 0:
-            print(f"Generating {network_groups_number} network group(s)...")
-            network_groups = generate_network_groups(network_groups_number, available_objects)
-            fmc_data = create_fmc_structure('network_groups', network_groups)
-            write_output(fmc_data, 'network_groups.nac.yaml')
+            print(f"{tag}Generating {network_groups_number} network group(s)...")
+            network_groups = generate_network_groups(network_groups_number, available_objects, profile, prefix)
+            output('network_groups', network_groups)
             # Add network group names to available objects
             available_objects.extend([ng['name'] for ng in network_groups])
 
@@ -147,10 +177,9 @@ def main():
     if 'url_groups_number' in settings and len(available_url_objects) > 0:
         url_groups_number = settings['url_groups_number']
         if url_groups_number > 0:
-            print(f"Generating {url_groups_number} URL group(s)...")
-            url_groups = generate_url_groups(url_groups_number, available_url_objects)
-            fmc_data = create_fmc_structure('url_groups', url_groups)
-            write_output(fmc_data, 'url_groups.nac.yaml')
+            print(f"{tag}Generating {url_groups_number} URL group(s)...")
+            url_groups = generate_url_groups(url_groups_number, available_url_objects, prefix)
+            output('url_groups', url_groups)
             # Add URL group names to available URL objects
             available_url_objects.extend([ug['name'] for ug in url_groups])
 
@@ -158,28 +187,26 @@ def main():
     if 'intrusion_policies_number' in settings:
         intrusion_policies_number = settings['intrusion_policies_number']
         if intrusion_policies_number > 0:
-            # First, generate prerequisites file (only once)
-            print("Generating intrusion policy prerequisites...")
-            prerequisites = create_intrusion_policy_prerequisites()
-            write_output(prerequisites, 'intrusion_policies_existing.nac.yaml')
-
-            # Then generate the intrusion policies
-            print(f"Generating {intrusion_policies_number} intrusion polic(ies)...")
-            intrusion_policies = generate_intrusion_policies(intrusion_policies_number)
-            fmc_data = create_fmc_policy_structure('intrusion_policies', intrusion_policies)
-            write_output(fmc_data, 'intrusion_policies.nac.yaml')
+            print(f"{tag}Generating {intrusion_policies_number} intrusion polic(ies)...")
+            intrusion_policies = generate_intrusion_policies(intrusion_policies_number, prefix)
+            fmc_data = create_fmc_policy_structure('intrusion_policies', intrusion_policies, path)
+            writer.submit(fmc_data, f'intrusion_policies{file_suffix}.nac.yaml')
             # Add intrusion policy names to available intrusion policies
             available_intrusion_policies.extend([ip['name'] for ip in intrusion_policies])
 
     # Generate access control policies (must be after all objects and policies)
+    access_control_policies = []
     if 'access_control_policies_number' in settings:
         policies_number = settings['access_control_policies_number']
-        categories_number = settings.get('access_control_policy_categories_number', 0)
-        rules_number = settings.get('access_control_policy_rules_number', 0)
+        # Documented keys first, older access_control_policy_* names still accepted
+        categories_number = settings.get('access_control_categories_number',
+                                         settings.get('access_control_policy_categories_number', 0))
+        rules_number = settings.get('access_control_rules_number',
+                                    settings.get('access_control_policy_rules_number', 0))
 
         if policies_number > 0 and (categories_number > 0 or rules_number > 0):
             # Generate the access control policies
-            print(f"Generating {policies_number} access control polic(ies) with {categories_number} categories and {rules_number} rules each...")
+            print(f"{tag}Generating {policies_number} access control polic(ies) with {categories_number} categories and {rules_number} rules each...")
             access_control_policies = generate_access_control_policies(
                 policies_number,
                 categories_number,
@@ -188,14 +215,93 @@ def main():
                 available_port_objects,
                 available_security_zones,
                 available_intrusion_policies,
-                available_url_objects
+                available_url_objects,
+                profile,
+                prefix
             )
 
-            # Write each policy to a separate file
+            # Write each policy to a separate file, or each category of a policy with the split layout
             for policy in access_control_policies:
                 policy_name = policy['name']
-                fmc_data = create_fmc_policy_structure('access_control_policies', [policy])
-                write_output(fmc_data, f'access_control_policies_{policy_name}.nac.yaml')
+                if settings.get('access_control_policy_layout', 'single') == 'split':
+                    fragments = split_policy(policy)
+                    width = len(str(len(fragments)))
+                    fragment_files = []
+                    for number, (category, start, end, fragment) in enumerate(fragments, 1):
+                        # Zero padded numbers keep the files, and so the merged rules, in category order
+                        filename = f'access_control_policies_{policy_name}.{number:0{width}d}.nac.yaml'
+                        fmc_data = create_fmc_policy_structure('access_control_policies', [fragment], path)
+                        writer.submit(fmc_data, filename)
+                        fragment_files.append((category, start, end, filename))
+                    write_json(policy_index(policy, path, fragment_files), f'access_control_policies_{policy_name}.index.json')
+                else:
+                    fmc_data = create_fmc_policy_structure('access_control_policies', [policy], path)
+                    writer.submit(fmc_data, f'access_control_policies_{policy_name}.nac.yaml')
+
+    # Mark objects reachable from the access rules and write what survives
+    if deferred:
+        if access_control_policies:
+            report = prune_objects(deferred, access_control_policies, settings.get('prune_referenced_fraction', 1.0))
+            for object_type, (generated, pruned, referenced) in report.items():
+                print(f"{tag}Pruned {pruned} of {generated} {object_type} ({referenced} referenced)")
+        else:
+            print(f"{tag}No access rules generated, skipping pruning")
+        for object_type in PRUNABLE_TYPES:
+            # Types pruned down to nothing get no file
+            if deferred.get(object_type):
+                fmc_data = create_fmc_structure(object_type, deferred[object_type], path)
+                writer.submit(fmc_data, f'{object_type}{file_suffix}.nac.yaml')
+
+    # Wait until every file is written and synced to disk
+    writer.close()
+
+    return path
+
+
+def main():
+    print("FMC YAML Configuration Generator")
+    print("=" * 50)
+
+    # Load configuration
+    config = load_config()
+    settings = parse_config(config)
+    profile = parse_workload_profile(config, settings)
+    if profile:
+        print(f"Using workload profile '{profile.name}'")
+    domains = parse_domains(config, settings)
+    for domain in domains:
+        fraction = domain['settings'].get('prune_referenced_fraction', 1.0)
+        if not 0 < fraction <= 1:
+            print(f"Error: prune_referenced_fraction must be greater than 0 and at most 1, got {fraction}", file=sys.stderr)
+            sys.exit(1)
+        layout = domain['settings'].get('access_control_policy_layout', 'single')
+        if layout not in POLICY_LAYOUTS:
+            print(f"Error: access_control_policy_layout must be one of {', '.join(POLICY_LAYOUTS)}, got {layout}", file=sys.stderr)
+            sys.exit(1)
+
+    # Clear data folder
+    clear_data_folder()
+
+    # Intrusion policy prerequisites (existing base policies in Global) are only written once
+    if any(domain['settings'].get('intrusion_policies_number', 0) > 0 for domain in domains):
+        print("Generating intrusion policy prerequisites...")
+        write_output(create_intrusion_policy_prerequisites(), 'intrusion_policies_existing.nac.yaml')
+
+    if len(domains) == 1:
+        generate_domain(domains[0], profile)
+    else:
+        # Every domain has its own seed, inherited names and output files, so
+        # domains are generated independently on separate worker processes
+        workers = settings.get('domain_workers') or os.cpu_count()
+        print(f"Generating {len(domains)} domains with {workers} worker(s)...")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(generate_domain, domain, profile, True) for domain in domains]
+            for future in futures:
+                try:
+                    print(f"Domain {future.result()} completed")
+                except Exception as e:
+                    print(f"Error: domain generation failed: {e}", file=sys.stderr)
+                    sys.exit(1)
 
     print("=" * 50)
     print("Generation completed successfully!")
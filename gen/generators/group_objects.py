@@ -5,7 +5,7 @@ Network group object generators
 import random
 
 
-def generate_network_groups(network_groups_number, available_objects):
+def generate_network_groups(network_groups_number, available_objects, profile=None, prefix=''):
     """
     Generate network group objects with sequential names and random object references.
     Each network group contains 3-5 objects from the available objects list.
@@ -13,9 +13,20 @@ def generate_network_groups(network_groups_number, available_objects):
     Args:
         network_groups_number: Number of network groups to generate
         available_objects: List of object names that can be referenced (hosts, networks, ranges, network_groups)
+        profile: Optional WorkloadProfile controlling how often objects are reused
+        prefix: Prefix for group names (used for child domains)
     """
     network_groups = []
 
+    # Groups generated here become referenceable by later groups, so the sampler
+    # covers them up front and unlocks them as they are created
+    sampler = None
+    if profile:
+        sampler = profile.reference_sampler(
+            available_objects,
+            [f'{prefix}network_group_{i}' for i in range(1, network_groups_number + 1)]
+        )
+
     for i in range(1, network_groups_number + 1):
         # Determine how many objects this group should have (3-5)
         num_objects = random.randint(3, 5)
@@ -24,16 +35,18 @@ def generate_network_groups(network_groups_number, available_objects):
         if len(available_objects) < num_objects:
             # If we don't have enough objects, use what we have
             selected_objects = available_objects.copy()
+        elif sampler:
+            selected_objects = sampler.sample(num_objects, limit=len(available_objects))
         else:
             selected_objects = random.sample(available_objects, num_objects)
 
         network_group = {
-            'name': f'network_group_{i}',
+            'name': f'{prefix}network_group_{i}',
             'objects': selected_objects
         }
         network_groups.append(network_group)
 
         # Add this network group to available objects for future groups
-        available_objects.append(f'network_group_{i}')
+        available_objects.append(f'{prefix}network_group_{i}')
 
     return network_groups
@@ -6,32 +6,32 @@ import random
 from utils.ip_utils import generate_random_ip, generate_random_subnet
 
 
-def generate_hosts(hosts_number):
-    """Generate host objects with sequential names and random IPs"""
+def generate_hosts(hosts_number, prefix=''):
+    """Generate host objects with sequential names (optionally prefixed) and random IPs"""
     hosts = []
     for i in range(1, hosts_number + 1):
         host = {
-            'name': f'host_{i}',
+            'name': f'{prefix}host_{i}',
             'ip': generate_random_ip()
         }
         hosts.append(host)
     return hosts
 
 
-def generate_networks(networks_number):
-    """Generate network objects with sequential names and random subnets"""
+def generate_networks(networks_number, prefix=''):
+    """Generate network objects with sequential names (optionally prefixed) and random subnets"""
     networks = []
     for i in range(1, networks_number + 1):
         network = {
-            'name': f'network_{i}',
+            'name': f'{prefix}network_{i}',
             'prefix': generate_random_subnet()
         }
         networks.append(network)
     return networks
 
 
-def generate_ranges(ranges_number):
-    """Generate range objects with sequential names and random IP ranges"""
+def generate_ranges(ranges_number, prefix=''):
+    """Generate range objects with sequential names (optionally prefixed) and random IP ranges"""
     ranges = []
     for i in range(1, ranges_number + 1):
         # Generate two IPs for the range
@@ -46,7 +46,7 @@ def generate_ranges(ranges_number):
             ip1, ip2 = ip2, ip1
 
         range_obj = {
-            'name': f'range_{i}',
+            'name': f'{prefix}range_{i}',
             'ip_range': f'{ip1}-{ip2}'
         }
         ranges.append(range_obj)
@@ -11,6 +11,9 @@ INTRUSION_POLICIES_BASE_POLICIES = [
     "Security Over Connectivity"
 ]
 
+# Valid intrusion policy inspection modes
+INSPECTION_MODES = ['DETECTION', 'PREVENTION']
+
 # Valid access control policy default actions
 ACCESS_CONTROL_POLICY_DEFAULT_ACTIONS = [
     "BLOCK",
@@ -29,25 +32,49 @@ ACCESS_RULE_ACTIONS = [
     "BLOCK_INTERACTIVE"
 ]
 
+# Access rule actions that cannot be combined with an intrusion policy
+ACTIONS_WITHOUT_INTRUSION_POLICY = ['BLOCK', 'TRUST', 'BLOCK_RESET', 'MONITOR']
+
 # Valid category sections
 CATEGORY_SECTIONS = ["mandatory", "default"]
 
 
-def generate_intrusion_policies(intrusion_policies_number):
+def even_counts(total, parts):
+    """Split total into parts counts differing by at most one, larger counts first"""
+    quotient, remainder = divmod(total, parts)
+    return [quotient + 1] * remainder + [quotient] * (parts - remainder)
+
+
+def _select_rule_objects(available, default_max, profile=None, sampler=None):
+    """
+    Select objects for one rule field.
+    Uses 1-default_max uniformly picked objects unless a workload profile says otherwise.
+    """
+    if profile:
+        num_objects = profile.draw_rule_size(default_max, len(available))
+    else:
+        num_objects = random.randint(1, min(default_max, len(available)))
+
+    if sampler:
+        return sampler.sample(num_objects)
+    return random.sample(available, num_objects)
+
+
+def generate_intrusion_policies(intrusion_policies_number, prefix=''):
     """
     Generate intrusion policy objects with sequential names.
     Each policy references one of the valid base policies.
+    Names are prefixed with prefix (used for child domains).
     """
-    inspection_modes = ['DETECTION', 'PREVENTION']
     intrusion_policies = []
 
     for i in range(1, intrusion_policies_number + 1):
         # Select random inspection mode and base policy
-        inspection_mode = random.choice(inspection_modes)
+        inspection_mode = random.choice(INSPECTION_MODES)
         base_policy = random.choice(INTRUSION_POLICIES_BASE_POLICIES)
 
         intrusion_policy = {
-            'name': f'intrusion_policy_{i}',
+            'name': f'{prefix}intrusion_policy_{i}',
             'inspection_mode': inspection_mode,
             'base_policy': base_policy
         }
@@ -88,7 +115,9 @@ def generate_access_control_policies(
     available_port_objects,
     available_security_zones,
     available_intrusion_policies,
-    available_url_objects
+    available_url_objects,
+    profile=None,
+    prefix=''
 ):
     """
     Generate access control policy objects with sequential names.
@@ -103,9 +132,20 @@ def generate_access_control_policies(
         available_security_zones: List of security zone names
         available_intrusion_policies: List of intrusion policy names
         available_url_objects: List of URL object names (urls, url_groups)
+        profile: Optional WorkloadProfile controlling object reuse, rule sizes and category skew
+        prefix: Prefix for policy names (used for child domains)
     """
     access_control_policies = []
 
+    # Samplers are built once; each draw is O(1) regardless of skew
+    network_sampler = port_sampler = zone_sampler = url_sampler = intrusion_sampler = None
+    if profile:
+        network_sampler = profile.reference_sampler(available_network_objects)
+        port_sampler = profile.reference_sampler(available_port_objects)
+        zone_sampler = profile.reference_sampler(available_security_zones)
+        url_sampler = profile.reference_sampler(available_url_objects)
+        intrusion_sampler = profile.reference_sampler(available_intrusion_policies)
+
     for policy_num in range(1, policies_number + 1):
         # Generate categories for this policy
         # Categories must be created in mandatory section first, then default section
@@ -138,8 +178,16 @@ def generate_access_control_policies(
         # Create ordered list of all categories: mandatory first, then default
         ordered_category_names = mandatory_categories + default_categories
 
-        # Calculate how many rules per category (distribute evenly)
-        rules_per_category = rules_per_policy // len(ordered_category_names) if ordered_category_names else rules_per_policy
+        # Skewed profiles size each category from the profile, otherwise rules are
+        # spread evenly and the first categories take one extra rule each
+        category_counts = profile.category_rule_counts(rules_per_policy, len(ordered_category_names)) if profile else None
+        if not category_counts and ordered_category_names:
+            category_counts = even_counts(rules_per_policy, len(ordered_category_names))
+        rule_categories = [
+            name
+            for name, count in zip(ordered_category_names, category_counts or [])
+            for _ in range(count)
+        ]
 
         # Generate access rules for this policy
         access_rules = []
@@ -151,50 +199,42 @@ def generate_access_control_policies(
 
             # Assign a category to every rule (mandatory)
             # Rules use mandatory categories first, then default categories
-            # Distribute evenly across categories within each section
-            if ordered_category_names:
-                category_index = (rule_num - 1) // rules_per_category
-                # Handle case where we have leftover rules
-                if category_index >= len(ordered_category_names):
-                    category_index = len(ordered_category_names) - 1
-                rule['category'] = ordered_category_names[category_index]
+            if rule_categories:
+                rule['category'] = rule_categories[rule_num - 1]
 
             # Add source zones (30% chance, 1-3 zones)
             if available_security_zones and random.random() > 0.7:
-                num_zones = random.randint(1, min(3, len(available_security_zones)))
-                rule['source_zones'] = random.sample(available_security_zones, num_zones)
+                rule['source_zones'] = _select_rule_objects(available_security_zones, 3, profile, zone_sampler)
 
             # Add destination zones (30% chance, 1-3 zones)
             if available_security_zones and random.random() > 0.7:
-                num_zones = random.randint(1, min(3, len(available_security_zones)))
-                rule['destination_zones'] = random.sample(available_security_zones, num_zones)
+                rule['destination_zones'] = _select_rule_objects(available_security_zones, 3, profile, zone_sampler)
 
             # Add source network objects (50% chance, 1-5 objects)
             if available_network_objects and random.random() > 0.5:
-                num_objects = random.randint(1, min(5, len(available_network_objects)))
-                rule['source_network_objects'] = random.sample(available_network_objects, num_objects)
+                rule['source_network_objects'] = _select_rule_objects(available_network_objects, 5, profile, network_sampler)
 
             # Add destination network objects (50% chance, 1-5 objects)
             if available_network_objects and random.random() > 0.5:
-                num_objects = random.randint(1, min(5, len(available_network_objects)))
-                rule['destination_network_objects'] = random.sample(available_network_objects, num_objects)
+                rule['destination_network_objects'] = _select_rule_objects(available_network_objects, 5, profile, network_sampler)
 
             # Add destination port objects (40% chance, 1-5 objects)
             if available_port_objects and random.random() > 0.6:
-                num_objects = random.randint(1, min(5, len(available_port_objects)))
-                rule['destination_port_objects'] = random.sample(available_port_objects, num_objects)
+                rule['destination_port_objects'] = _select_rule_objects(available_port_objects, 5, profile, port_sampler)
 
             # Add URL objects (40% chance, 1-3 objects)
             if available_url_objects and random.random() > 0.6:
-                num_objects = random.randint(1, min(3, len(available_url_objects)))
-                rule['url_objects'] = random.sample(available_url_objects, num_objects)
+                rule['url_objects'] = _select_rule_objects(available_url_objects, 3, profile, url_sampler)
 
             # Add intrusion policy (30% chance)
             # Cannot be used with BLOCK, TRUST, BLOCK_RESET, or MONITOR actions
             if (available_intrusion_policies and
-                rule['action'] not in ['BLOCK', 'TRUST', 'BLOCK_RESET', 'MONITOR'] and
+                rule['action'] not in ACTIONS_WITHOUT_INTRUSION_POLICY and
                 random.random() > 0.7):
-                rule['intrusion_policy'] = random.choice(available_intrusion_policies)
+                if intrusion_sampler:
+                    rule['intrusion_policy'] = intrusion_sampler.choice()
+                else:
+                    rule['intrusion_policy'] = random.choice(available_intrusion_policies)
 
             # Add logging options
             # send_events_to_fmc is always true
@@ -230,7 +270,7 @@ def generate_access_control_policies(
 
         # Create the access control policy
         access_control_policy = {
-            'name': f'access_control_policy_{policy_num}',
+            'name': f'{prefix}access_control_policy_{policy_num}',
             'default_action': random.choice(ACCESS_CONTROL_POLICY_DEFAULT_ACTIONS),
             'categories': categories,
             'access_rules': access_rules
@@ -5,23 +5,38 @@ Service object generators: ports, icmpv4s, port_groups
 import random
 
 
-def generate_ports(ports_number):
+# Protocols of generated port objects
+PORT_PROTOCOLS = ['TCP', 'UDP', 'ESP']
+
+# Valid ICMP type and code combinations based on IANA specifications
+ICMPV4_TYPE_CODES = {
+    0: [0],                    # Echo Reply
+    3: [0, 1, 2, 3, 4, 5],     # Destination Unreachable
+    5: [0, 1, 2, 3],           # Redirect
+    8: [0],                    # Echo Request
+    11: [0, 1],                # Time Exceeded
+    12: [0, 1, 2],             # Parameter Problem
+    40: [0, 1, 2, 3, 4, 5]     # Photuris
+}
+
+
+def generate_ports(ports_number, prefix=''):
     """
     Generate port objects with sequential names and random ports/protocols.
     Mix of single ports and port ranges with TCP, UDP, or ESP protocols.
+    Names are prefixed with prefix (used for child domains).
     """
     ports = []
-    protocols = ['TCP', 'UDP', 'ESP']
 
     for i in range(1, ports_number + 1):
         # Randomly decide if this is a single port or range
         is_range = random.choice([True, False])
 
         # Select random protocol
-        protocol = random.choice(protocols)
+        protocol = random.choice(PORT_PROTOCOLS)
 
         port_obj = {
-            'name': f'port_{i}',
+            'name': f'{prefix}port_{i}',
             'protocol': protocol
         }
 
@@ -43,34 +58,24 @@ def generate_ports(ports_number):
     return ports
 
 
-def generate_icmpv4s(icmpv4s_number):
+def generate_icmpv4s(icmpv4s_number, prefix=''):
     """
     Generate ICMPv4 objects with sequential names and valid ICMP type/code combinations.
     Uses IANA-compliant ICMP type and code mappings.
+    Names are prefixed with prefix (used for child domains).
     """
-    # Valid ICMP type and code combinations based on IANA specifications
-    valid_combinations = {
-        0: [0],                    # Echo Reply
-        3: [0, 1, 2, 3, 4, 5],     # Destination Unreachable
-        5: [0, 1, 2, 3],           # Redirect
-        8: [0],                    # Echo Request
-        11: [0, 1],                # Time Exceeded
-        12: [0, 1, 2],             # Parameter Problem
-        40: [0, 1, 2, 3, 4, 5]     # Photuris
-    }
-
     icmpv4s = []
 
     for i in range(1, icmpv4s_number + 1):
         # Select a random valid ICMP type
-        icmp_type = random.choice(list(valid_combinations.keys()))
+        icmp_type = random.choice(list(ICMPV4_TYPE_CODES.keys()))
 
         # Select a valid code for this type
-        valid_codes = valid_combinations[icmp_type]
+        valid_codes = ICMPV4_TYPE_CODES[icmp_type]
         code = random.choice(valid_codes)
 
         icmpv4_obj = {
-            'name': f'icmpv4_{i}',
+            'name': f'{prefix}icmpv4_{i}',
             'icmp_type': icmp_type,
             'code': code
         }
@@ -80,7 +85,7 @@ def generate_icmpv4s(icmpv4s_number):
     return icmpv4s
 
 
-def generate_port_groups(port_groups_number, available_port_objects):
+def generate_port_groups(port_groups_number, available_port_objects, profile=None, prefix=''):
     """
     Generate port group objects with sequential names and random port/icmpv4 references.
     Each port group contains 2-6 objects from the available port objects list.
@@ -88,8 +93,11 @@ def generate_port_groups(port_groups_number, available_port_objects):
     Args:
         port_groups_number: Number of port groups to generate
         available_port_objects: List of object names that can be referenced (ports and icmpv4s only)
+        profile: Optional WorkloadProfile controlling how often objects are reused
+        prefix: Prefix for group names (used for child domains)
     """
     port_groups = []
+    sampler = profile.reference_sampler(available_port_objects) if profile else None
 
     for i in range(1, port_groups_number + 1):
         # Determine how many objects this group should have (2-6)
@@ -99,11 +107,13 @@ def generate_port_groups(port_groups_number, available_port_objects):
         if len(available_port_objects) < num_objects:
             # If we don't have enough objects, use what we have
             selected_objects = available_port_objects.copy()
+        elif sampler:
+            selected_objects = sampler.sample(num_objects)
         else:
             selected_objects = random.sample(available_port_objects, num_objects)
 
         port_group = {
-            'name': f'port_group_{i}',
+            'name': f'{prefix}port_group_{i}',
             'objects': selected_objects
         }
         port_groups.append(port_group)
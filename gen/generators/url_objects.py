@@ -5,9 +5,10 @@ URL object generators: urls, url_groups
 import random
 
 
-def generate_urls(urls_number):
+def generate_urls(urls_number, prefix=''):
     """
     Generate URL objects with sequential names and random subdomains of example.com.
+    Names are prefixed with prefix (used for child domains).
     """
     subdomains = ['www', 'api', 'app', 'web', 'portal', 'admin', 'test', 'dev', 'staging', 'prod',
                   'mail', 'shop', 'store', 'blog', 'news', 'support', 'help', 'docs', 'wiki', 'cdn']
@@ -18,7 +19,7 @@ def generate_urls(urls_number):
         subdomain = random.choice(subdomains)
 
         url_obj = {
-            'name': f'url_{i}',
+            'name': f'{prefix}url_{i}',
             'url': f'https://{subdomain}.example.com'
         }
         urls.append(url_obj)
@@ -26,7 +27,7 @@ def generate_urls(urls_number):
     return urls
 
 
-def generate_url_groups(url_groups_number, available_url_objects):
+def generate_url_groups(url_groups_number, available_url_objects, prefix=''):
     """
     Generate URL group objects with sequential names.
     Each URL group contains 2-4 URL references and 1-3 literal URLs.
@@ -34,13 +35,14 @@ def generate_url_groups(url_groups_number, available_url_objects):
     Args:
         url_groups_number: Number of URL groups to generate
         available_url_objects: List of URL object names that can be referenced
+        prefix: Prefix for group names (used for child domains)
     """
     subdomains = ['www', 'api', 'app', 'web', 'portal', 'admin', 'test', 'dev', 'staging', 'prod',
                   'mail', 'shop', 'store', 'blog', 'news', 'support', 'help', 'docs', 'wiki', 'cdn']
     url_groups = []
 
     for i in range(1, url_groups_number + 1):
-        url_group = {'name': f'url_group_{i}'}
+        url_group = {'name': f'{prefix}url_group_{i}'}
 
         # Add URL object references (2-4 references)
         if len(available_url_objects) > 0:
@@ -5,20 +5,24 @@ Security zone object generators
 import random
 
 
-def generate_security_zones(security_zones_number):
+# Interface types of security zones
+INTERFACE_TYPES = ['ROUTED', 'ASA', 'INLINE', 'SWITCHED']
+
+
+def generate_security_zones(security_zones_number, prefix=''):
     """
     Generate security zone objects with sequential names and random interface types.
     Interface types: ROUTED, ASA, INLINE, SWITCHED
+    Names are prefixed with prefix (used for child domains).
     """
-    interface_types = ['ROUTED', 'ASA', 'INLINE', 'SWITCHED']
     security_zones = []
 
     for i in range(1, security_zones_number + 1):
         # Select random interface type
-        interface_type = random.choice(interface_types)
+        interface_type = random.choice(INTERFACE_TYPES)
 
         security_zone = {
-            'name': f'security_zone_{i}',
+            'name': f'{prefix}security_zone_{i}',
             'interface_type': interface_type
         }
         security_zones.append(security_zone)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Mock FMC Server
+Local stand-in for FMC bulk object endpoints, used to benchmark push.py offline
+"""
+
+import argparse
+
+from fmc_api.mock_server import create_mock_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock FMC server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8443)
+    parser.add_argument('--latency-ms', type=float, default=50.0, help="Base latency of every request")
+    parser.add_argument('--per-object-ms', type=float, default=0.5, help="Extra latency per object in a bulk request")
+    parser.add_argument('--requests-per-minute', type=int, default=120,
+                        help="Requests allowed per sliding minute, 0 disables the cap")
+    parser.add_argument('--domain', action='append', default=[], help="Extra domain name to expose (repeatable)")
+    args = parser.parse_args()
+
+    server = create_mock_server(
+        args.host,
+        args.port,
+        latency=args.latency_ms / 1000,
+        per_object_latency=args.per_object_ms / 1000,
+        requests_per_minute=args.requests_per_minute,
+        domains=args.domain
+    )
+
+    print(f"Mock FMC listening on http://{args.host}:{args.port} "
+          f"({args.requests_per_minute} requests/minute, {args.latency_ms:.0f} ms latency)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        state = server.RequestHandlerClass.state
+        print(f"\nServed {state.requests} requests, throttled {state.throttled}, stored {len(state.objects)} objects")
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+FMC Bulk Push Tool
+Creates objects from data/*.nac.yaml through the FMC bulk REST API and reports throughput
+"""
+
+import argparse
+import sys
+import time
+
+from utils.config import load_config, parse_push_config
+from utils.file_ops import load_fmc_data
+from fmc_api.client import FmcClient, FmcApiError
+from fmc_api.pusher import push_domain
+
+
+def parse_args(push_settings):
+    parser = argparse.ArgumentParser(description="Push generated objects to FMC with bulk requests")
+    parser.add_argument('--url', default=push_settings['url'], help="FMC base URL")
+    parser.add_argument('--username', default=push_settings['username'])
+    parser.add_argument('--password', default=push_settings['password'])
+    parser.add_argument('--concurrency', type=int, default=push_settings['concurrency'],
+                        help="Bulk requests in flight")
+    parser.add_argument('--batch-size', type=int, default=push_settings['batch_size'],
+                        help="Objects per bulk request")
+    parser.add_argument('--requests-per-minute', type=int, default=push_settings['requests_per_minute'],
+                        help="Request pacing rate, 0 disables pacing")
+    parser.add_argument('--burst', type=int, default=push_settings['burst'])
+    parser.add_argument('--retries', type=int, default=push_settings['retries'])
+    return parser.parse_args()
+
+
+def main():
+    config = load_config()
+    push_settings = parse_push_config(config)
+    args = parse_args(push_settings)
+
+    print("FMC Bulk Push")
+    print("=" * 50)
+
+    domains = load_fmc_data()
+    if not any(domain['objects'] for domain in domains.values()):
+        print("Error: no objects found in data folder, run gen.py first", file=sys.stderr)
+        sys.exit(1)
+
+    client = FmcClient(
+        args.url,
+        args.username,
+        args.password,
+        concurrency=args.concurrency,
+        requests_per_minute=args.requests_per_minute,
+        burst=args.burst,
+        retries=args.retries,
+        timeout=push_settings['timeout'],
+        verify_ssl=push_settings['verify_ssl']
+    )
+
+    started = time.perf_counter()
+    total_objects = 0
+    try:
+        client.authenticate()
+        # Parents first, child domains may reference objects created in their ancestors
+        refs_by_domain = {}
+        for domain_name in sorted(domains, key=lambda name: name.count('/')):
+            parent = domain_name.rpartition('/')[0]
+            while parent and parent not in refs_by_domain:
+                parent = parent.rpartition('/')[0]
+            refs = dict(refs_by_domain.get(parent, {}))
+            refs_by_domain[domain_name] = refs
+
+            domain = domains[domain_name]
+            if not domain['objects']:
+                continue
+            print(f"Pushing objects to domain {domain_name}...")
+            results = push_domain(client, domain_name, domain['objects'], args.batch_size, args.concurrency, refs)
+            for object_type, result in results.items():
+                rate = result['objects'] / result['seconds'] if result['seconds'] else 0
+                print(f"  {object_type:<16} {result['objects']:>8} objects  {result['requests']:>5} requests  "
+                      f"{result['seconds']:>8.2f}s  {rate:>10.1f} objects/s")
+                total_objects += result['objects']
+    except (FmcApiError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        client.close()
+
+    elapsed = time.perf_counter() - started
+    print("=" * 50)
+    print(f"Pushed {total_objects} objects in {elapsed:.2f}s ({total_objects / elapsed:.1f} objects/s)")
+    print(f"Requests: {client.stats['requests']}, retries: {client.stats['retries']}, "
+          f"throttled: {client.stats['throttled']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+FMC Reference Index
+Builds a persistent reverse reference index over the generated files and answers
+which groups and access rules use an object, and what deleting it would break
+"""
+
+import argparse
+import sys
+import time
+from collections import defaultdict
+
+from analysis.refindex import ReferenceIndex
+
+
+def print_users(users, show):
+    """Print (name, kind) pairs grouped by kind"""
+    by_kind = defaultdict(list)
+    for name, kind in users:
+        by_kind[kind or 'undefined'].append(name)
+    for kind, names in sorted(by_kind.items()):
+        print(f"  {kind}: {len(names)}")
+        for name in names[:show]:
+            print(f"    {name}")
+        if len(names) > show:
+            print(f"    ... {len(names) - show} more")
+
+
+def main():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--index', default=None, help="Index file (default: data/.refindex.sqlite)")
+    query = argparse.ArgumentParser(add_help=False, parents=[common])
+    query.add_argument('--no-update', action='store_true', help="Query the index without checking for changed files")
+    query.add_argument('--show', type=int, default=20, help="Number of names to list per kind")
+
+    parser = argparse.ArgumentParser(description="Reverse reference index over generated FMC data")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', parents=[common], help="Create or incrementally update the index")
+    build.add_argument('--rebuild', action='store_true', help="Rescan every file")
+    build.add_argument('--workers', type=int, default=None, help="Scanning processes (default: CPU count)")
+
+    uses = subparsers.add_parser('uses', parents=[query], help="Groups and access rules using an object")
+    uses.add_argument('name', help="Object name")
+    uses.add_argument('--direct', action='store_true', help="Only list direct references")
+
+    impact = subparsers.add_parser('impact', parents=[query], help="What deleting an object breaks")
+    impact.add_argument('name', help="Object name")
+
+    args = parser.parse_args()
+
+    index = ReferenceIndex(index_path=args.index)
+    try:
+        if args.command == 'build' or not args.no_update:
+            started = time.perf_counter()
+            stats = index.update(rebuild=getattr(args, 'rebuild', False), workers=getattr(args, 'workers', None))
+            seconds = time.perf_counter() - started
+            if args.command == 'build' or stats['scanned'] or stats['removed']:
+                print(f"Index updated in {seconds:.3f}s: {stats['scanned']} files scanned, "
+                      f"{stats['removed']} removed, {stats['unchanged']} unchanged")
+
+        if args.command == 'build':
+            return
+
+        kind = index.kind(args.name)
+        if kind is None:
+            print(f"Error: {args.name} is not defined in the data folder", file=sys.stderr)
+            sys.exit(1)
+
+        started = time.perf_counter()
+        if args.command == 'uses':
+            users = index.direct_users(args.name) if args.direct else index.all_users(args.name)
+            seconds = time.perf_counter() - started
+            scope = "directly" if args.direct else "directly or through nested groups"
+            print(f"{args.name} ({kind}) is used {scope} by {len(users)} objects and rules ({seconds * 1000:.1f} ms)")
+            print_users(users, args.show)
+        else:
+            result = index.impact(args.name)
+            seconds = time.perf_counter() - started
+            print(f"Deleting {args.name} ({kind}) ({seconds * 1000:.1f} ms)")
+            print(f"Broken references: {len(result['broken'])}")
+            print_users(result['broken'], args.show)
+            print(f"Affected through nested groups: {len(result['affected'])}")
+            print_users(result['affected'], args.show)
+    finally:
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+FMC Access Rule Shadowing Analyzer
+Reports access rules that can never match because an earlier rule covers them,
+and optionally drops them from the generated policy files
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+
+from utils.file_ops import get_data_path, load_fmc_data, load_yaml_file, write_json, write_output
+from utils.layout import shift_policy_index
+from analysis.resolve import ObjectResolver, load_policies
+from analysis.shadowing import find_dead_rules, find_dead_rules_naive
+
+
+def drop_rules(dead_by_policy):
+    """Rewrite policy files without the dead rules, and the positional indexes of split policies"""
+    removed = {}
+    for path in sorted(get_data_path().glob('access_control_policies_*.nac.yaml')):
+        data = load_yaml_file(path) or {}
+        changed = False
+        for domain in (data.get('fmc') or {}).get('domains', []):
+            for policy in (domain.get('policies') or {}).get('access_control_policies', []):
+                dead_names = dead_by_policy.get(policy['name'])
+                if not dead_names:
+                    continue
+                rules = policy.get('access_rules', [])
+                policy['access_rules'] = [rule for rule in rules if rule['name'] not in dead_names]
+                changed = changed or len(policy['access_rules']) != len(rules)
+                counts = removed.setdefault(policy['name'], Counter())
+                counts.update(rule.get('category') for rule in rules if rule['name'] in dead_names)
+        if changed:
+            write_output(data, path.name)
+
+    for path in sorted(get_data_path().glob('access_control_policies_*.index.json')):
+        with open(path) as f:
+            index = json.load(f)
+        if removed.get(index['policy']):
+            shift_policy_index(index, removed[index['policy']])
+            write_json(index, path.name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find shadowed and redundant access rules")
+    parser.add_argument('--policy', action='append', help="Policy name (repeatable, default: all policies)")
+    parser.add_argument('--show', type=int, default=10, help="Number of dead rules to list per policy")
+    parser.add_argument('--drop', action='store_true', help="Remove shadowed and redundant rules from the data files")
+    parser.add_argument('--verify', action='store_true', help="Cross-check against the quadratic pairwise comparison")
+    args = parser.parse_args()
+
+    print("FMC Access Rule Shadowing Analyzer")
+    print("=" * 50)
+
+    domains = load_fmc_data()
+    policies = load_policies(domains)
+    names = args.policy or list(policies)
+    missing = [name for name in names if name not in policies]
+    if missing:
+        print(f"Error: unknown policies: {', '.join(missing)}", file=sys.stderr)
+        sys.exit(1)
+
+    resolver = ObjectResolver(domains)
+    dead_by_policy = {}
+    try:
+        for name in names:
+            spaces = resolver.policy_spaces(policies[name])
+
+            started = time.perf_counter()
+            dead = find_dead_rules(spaces)
+            seconds = time.perf_counter() - started
+
+            kinds = Counter(rule.kind for rule in dead)
+            print(f"Policy {name}: {len(spaces)} rules, {kinds['shadowed']} shadowed, "
+                  f"{kinds['redundant']} redundant ({seconds:.3f}s)")
+            for rule in dead[:args.show]:
+                print(f"  {rule.name:<24} {rule.kind:<10} covered by {rule.covered_by_name}")
+            if len(dead) > args.show:
+                print(f"  ... {len(dead) - args.show} more")
+
+            if args.verify:
+                started = time.perf_counter()
+                expected = find_dead_rules_naive(spaces)
+                seconds = time.perf_counter() - started
+                if expected != dead:
+                    print(f"Error: indexed and pairwise results differ for policy {name}", file=sys.stderr)
+                    sys.exit(1)
+                print(f"  Verified against pairwise comparison ({seconds:.3f}s)")
+
+            dead_by_policy[name] = {rule.name for rule in dead}
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.drop:
+        print("Dropping dead rules...")
+        drop_rules(dead_by_policy)
+
+    print("=" * 50)
+    print("Analysis completed successfully!")
+
+
+if __name__ == '__main__':
+    main()
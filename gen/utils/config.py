@@ -5,6 +5,7 @@ Configuration loading and parsing utilities
 import yaml
 import sys
 from pathlib import Path
+from utils.workload import DISTRIBUTIONS, WorkloadProfile
 
 
 def load_config():
@@ -37,3 +38,51 @@ def parse_config(config):
             settings.update(item)
 
     return settings
+
+
+def parse_workload_profile(config, settings):
+    """
+    Build the workload profile selected by the 'workload_profile' setting.
+    Returns None when no profile is selected, which keeps uniform sampling.
+    """
+    profile_name = settings.get('workload_profile')
+    if not profile_name:
+        return None
+
+    profiles = config.get('profiles') or {}
+    if profile_name not in profiles:
+        print(f"Error: workload profile '{profile_name}' not found in 'profiles' section", file=sys.stderr)
+        sys.exit(1)
+
+    spec = profiles[profile_name] or {}
+    for key in ['reuse', 'rule_size', 'category_skew']:
+        distribution = (spec.get(key) or {}).get('distribution', 'uniform')
+        if distribution not in DISTRIBUTIONS:
+            print(f"Error: unknown distribution '{distribution}' in profile '{profile_name}' ({key})", file=sys.stderr)
+            sys.exit(1)
+
+    return WorkloadProfile(profile_name, spec)
+
+
+# Defaults of the push section, used for keys missing from cfg.yaml
+PUSH_DEFAULTS = {
+    'url': 'http://127.0.0.1:8443',
+    'username': 'admin',
+    'password': 'admin',
+    'verify_ssl': False,
+    'concurrency': 4,
+    'batch_size': 1000,
+    'requests_per_minute': 110,
+    'burst': 10,
+    'retries': 5,
+    'timeout': 60
+}
+
+
+def parse_push_config(config):
+    """Parse the optional 'push' section used by the FMC push tool"""
+    push_settings = dict(PUSH_DEFAULTS)
+    for item in config.get('push') or []:
+        if isinstance(item, dict):
+            push_settings.update(item)
+    return push_settings
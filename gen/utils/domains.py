@@ -0,0 +1,133 @@
+"""
+Domain hierarchy utilities for multi-domain generation
+"""
+
+import random
+import re
+import sys
+
+
+def domain_slug(path):
+    """Return a file and object name friendly slug of a domain path ('' for Global)"""
+    parts = path.split('/')[1:]
+    return re.sub(r'[^a-z0-9]+', '_', '_'.join(parts).lower()).strip('_')
+
+
+def domain_object_names(settings, prefix, inherited):
+    """
+    Return the names of objects a domain will generate, grouped the way gen.py
+    tracks them: network, port, url, zone and intrusion policy names.
+
+    Names are sequential, so they are known without generating anything; child
+    domains use them to reference objects of their ancestors.
+
+    Args:
+        settings: Domain settings with object counts
+        prefix: Object name prefix of the domain
+        inherited: Names inherited from ancestors (same grouping), used to decide
+                   whether groups can be generated at all
+    """
+    def names(key, base):
+        return [f'{prefix}{base}_{i}' for i in range(1, settings.get(key, 0) + 1)]
+
+    network = names('hosts_number', 'host') + names('networks_number', 'network') + names('ranges_number', 'range')
+    port = names('ports_number', 'port') + names('icmpv4s_number', 'icmpv4')
+    url = names('urls_number', 'url')
+
+    if port or inherited['port']:
+        port += names('port_groups_number', 'port_group')
+    if network or inherited['network']:
+        network += names('network_groups_number', 'network_group')
+    if url or inherited['url']:
+        url += names('url_groups_number', 'url_group')
+
+    return {
+        'network': network,
+        'port': port,
+        'url': url,
+        'zone': names('security_zones_number', 'security_zone'),
+        'intrusion': names('intrusion_policies_number', 'intrusion_policy')
+    }
+
+
+def parse_domains(config, settings):
+    """
+    Flatten the optional 'domains' hierarchy of cfg.yaml into domain specs.
+
+    Without a 'domains' section a single Global domain using the top level
+    settings is returned. Specs are ordered parents first and contain: path,
+    settings, prefix, file_suffix, seed, inherited object names and whether
+    child domains inherit the domain's objects (inherited_by_children).
+    """
+    tree = config.get('domains')
+    if not tree:
+        tree = [{'name': 'Global'}]
+
+    if len(tree) != 1 or tree[0].get('name') != 'Global':
+        print("Error: 'domains' must contain exactly one root domain named 'Global'", file=sys.stderr)
+        sys.exit(1)
+
+    # Seeds are derived from the base seed and the domain path, so every domain
+    # gets an independent, reproducible random stream
+    base_seed = settings.get('seed')
+    if base_seed is None and config.get('domains'):
+        base_seed = random.SystemRandom().randrange(2 ** 32)
+
+    empty = {'network': [], 'port': [], 'url': [], 'zone': [], 'intrusion': []}
+    specs = []
+
+    def walk(node, parent_path, inherited):
+        name = node.get('name')
+        if not name or '/' in name:
+            print(f"Error: invalid domain name '{name}'", file=sys.stderr)
+            sys.exit(1)
+        path = f'{parent_path}/{name}' if parent_path else name
+        if any(spec['path'] == path for spec in specs):
+            print(f"Error: duplicate domain '{path}'", file=sys.stderr)
+            sys.exit(1)
+
+        domain_settings = dict(settings)
+        for item in node.get('settings') or []:
+            if isinstance(item, dict):
+                domain_settings.update(item)
+
+        slug = domain_slug(path)
+        file_suffix = f'_{slug}' if slug else ''
+        prefix = node.get('prefix', f'{slug}_' if slug else '')
+        if not isinstance(prefix, str):
+            print(f"Error: prefix of domain '{path}' must be a string", file=sys.stderr)
+            sys.exit(1)
+        # Different names can share a slug ('Region A', 'region-a'), which would make
+        # the domains overwrite each other's files or generate the same object names
+        for spec in specs:
+            if spec['file_suffix'] == file_suffix:
+                print(f"Error: domains '{spec['path']}' and '{path}' map to the same output files "
+                      f"(suffix '{spec['file_suffix']}'), rename one of them", file=sys.stderr)
+                sys.exit(1)
+            if spec['prefix'] == prefix:
+                print(f"Error: domains '{spec['path']}' and '{path}' use the same object name prefix "
+                      f"'{prefix}', rename one of them or set a different prefix", file=sys.stderr)
+                sys.exit(1)
+        own_inherited = inherited if node.get('inherit_objects', True) else empty
+        seed = node.get('seed')
+        if seed is None and base_seed is not None:
+            seed = random.Random(f'{base_seed}:{path}').randrange(2 ** 32)
+
+        specs.append({
+            'path': path,
+            'settings': domain_settings,
+            'prefix': prefix,
+            'file_suffix': file_suffix,
+            'seed': seed,
+            'inherited': own_inherited,
+            'inherited_by_children': any(child.get('inherit_objects', True) for child in node.get('domains') or [])
+        })
+
+        # Children see this domain's objects plus everything it inherited
+        own_names = domain_object_names(domain_settings, prefix, own_inherited)
+        child_inherited = {key: own_inherited[key] + own_names[key] for key in own_names}
+        for child in node.get('domains') or []:
+            walk(child, path, child_inherited)
+
+    walk(tree[0], '', empty)
+    return specs
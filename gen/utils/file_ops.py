@@ -2,17 +2,29 @@
 File operation utilities for YAML generation
 """
 
+import json
 import yaml
 from pathlib import Path
 
+# libyaml is much faster on large files, fall back to the pure Python loader
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
 
-def create_fmc_structure(object_type, objects):
+# Same for dumping, the libyaml emitter produces identical output
+Dumper = getattr(yaml, 'CDumper', yaml.Dumper)
+
+
+def get_data_path():
+    """Return the path of the data folder"""
+    return Path(__file__).parent.parent.parent / 'data'
+
+
+def create_fmc_structure(object_type, objects, domain='Global'):
     """Create the FMC YAML structure for a specific object type"""
     return {
         'fmc': {
             'domains': [
                 {
-                    'name': 'Global',
+                    'name': domain,
                     'objects': {
                         object_type: objects
                     }
@@ -22,13 +34,13 @@ def create_fmc_structure(object_type, objects):
     }
 
 
-def create_fmc_policy_structure(policy_type, policies):
+def create_fmc_policy_structure(policy_type, policies, domain='Global'):
     """Create the FMC YAML structure for a specific policy type"""
     return {
         'fmc': {
             'domains': [
                 {
-                    'name': 'Global',
+                    'name': domain,
                     'policies': {
                         policy_type: policies
                     }
@@ -40,11 +52,11 @@ def create_fmc_policy_structure(policy_type, policies):
 
 def clear_data_folder():
     """Clear the data folder before generation"""
-    data_path = Path(__file__).parent.parent.parent / 'data'
+    data_path = get_data_path()
 
     if data_path.exists():
-        # Remove all files in data folder
-        for file in data_path.glob('*.yaml'):
+        # Remove all files in data folder (and policy indexes of the split layout)
+        for file in [*data_path.glob('*.yaml'), *data_path.glob('*.index.json')]:
             file.unlink()
         print(f"Cleared data folder")
     else:
@@ -55,9 +67,65 @@ def clear_data_folder():
 
 def write_output(data, filename):
     """Write generated data to YAML file in data folder"""
-    output_path = Path(__file__).parent.parent.parent / 'data' / filename
+    output_path = get_data_path() / filename
+
+    with open(output_path, 'w') as f:
+        yaml.dump(data, f, Dumper=Dumper, default_flow_style=False, sort_keys=False)
+
+    print(f"Generated {filename}")
+
+
+def write_json(data, filename):
+    """Write data to a JSON file in data folder"""
+    output_path = get_data_path() / filename
 
     with open(output_path, 'w') as f:
-        yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+        json.dump(data, f, indent=2)
 
     print(f"Generated {filename}")
+
+
+def _merge_policy(policy, fragment):
+    """Merge a fragment of a policy split across files, rule lists are concatenated in file order"""
+    for key, value in fragment.items():
+        if isinstance(value, list) and isinstance(policy.get(key), list):
+            policy[key].extend(value)
+        else:
+            policy.setdefault(key, value)
+
+
+def load_yaml_file(path):
+    """Load a single YAML file"""
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+
+def load_fmc_data(data_path=None, pattern='*.nac.yaml'):
+    """
+    Load generated files and merge them per domain.
+
+    Returns a dict of domain name -> {'objects': {type: [...]}, 'policies': {type: [...]}}.
+    Policies split across files (split layout) are merged by name like nac-fmc does.
+    Files under the 'existing' key (prerequisites already present in FMC) are skipped.
+    """
+    if data_path is None:
+        data_path = get_data_path()
+
+    domains = {}
+    policies = {}
+    for path in sorted(Path(data_path).glob(pattern)):
+        data = load_yaml_file(path) or {}
+        for domain in (data.get('fmc') or {}).get('domains', []):
+            merged = domains.setdefault(domain['name'], {'objects': {}, 'policies': {}})
+            for item_type, items in (domain.get('objects') or {}).items():
+                merged['objects'].setdefault(item_type, []).extend(items or [])
+            for policy_type, items in (domain.get('policies') or {}).items():
+                for policy in items or []:
+                    key = (domain['name'], policy_type, policy.get('name'))
+                    if key in policies:
+                        _merge_policy(policies[key], policy)
+                    else:
+                        policies[key] = policy
+                        merged['policies'].setdefault(policy_type, []).append(policy)
+
+    return domains
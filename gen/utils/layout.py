@@ -0,0 +1,89 @@
+"""
+Output layouts of access control policies
+"""
+
+# single: one file per policy
+# split:  one file per category of a policy plus a positional index
+POLICY_LAYOUTS = ['single', 'split']
+
+
+def split_policy(policy):
+    """
+    Split an access control policy into one fragment per category.
+
+    Every fragment carries the policy name so nac-fmc merges the fragments back
+    into one policy; the first fragment also carries the remaining policy
+    attributes (default action, categories). Rules must be in category order.
+
+    Returns:
+        List of (category, start, end, fragment), start and end being the rule offsets
+        of the fragment in the policy (end exclusive)
+    """
+    rules = policy.get('access_rules', [])
+    header = {key: value for key, value in policy.items() if key != 'access_rules'}
+
+    fragments = []
+    start = 0
+    while start < len(rules) or not fragments:
+        category = rules[start].get('category') if rules else None
+        end = start
+        while end < len(rules) and rules[end].get('category') == category:
+            end += 1
+        fragment = dict(header) if not fragments else {'name': policy['name']}
+        fragment['access_rules'] = rules[start:end]
+        fragments.append((category, start, end, fragment))
+        start = end
+
+    return fragments
+
+
+def policy_index(policy, domain, fragment_files):
+    """
+    Build the positional index of a split policy.
+
+    Args:
+        policy: Access control policy
+        domain: Domain name of the policy
+        fragment_files: List of (category, start, end, filename) of the written fragments
+
+    Returns:
+        Dict with the policy name, domain, rule count and per category rule offset range
+        and file (categories without rules have an empty range and no file)
+    """
+    by_category = {category: (start, end, filename) for category, start, end, filename in fragment_files}
+    categories = []
+    offset = 0
+    for category in policy.get('categories', []):
+        start, end, filename = by_category.get(category['name'], (offset, offset, None))
+        categories.append({
+            'name': category['name'],
+            'section': category.get('section'),
+            'file': filename,
+            'start': start,
+            'end': end
+        })
+        offset = end
+
+    return {
+        'policy': policy['name'],
+        'domain': domain,
+        'rules': len(policy.get('access_rules', [])),
+        'files': [filename for _, _, _, filename in fragment_files],
+        'categories': categories
+    }
+
+
+def shift_policy_index(index, removed_by_category):
+    """
+    Update a positional index after rules were removed from a split policy.
+
+    Args:
+        index: Index built by policy_index, updated in place
+        removed_by_category: Dict of category name to number of removed rules
+    """
+    removed = 0
+    for category in index['categories']:
+        category['start'] -= removed
+        removed += removed_by_category.get(category['name'], 0)
+        category['end'] -= removed
+    index['rules'] -= removed
@@ -0,0 +1,119 @@
+"""
+Mark-and-sweep pruning of generated objects that nothing references
+"""
+
+# Object types that may be pruned, groups first so that the members of
+# unreferenced groups kept for a target fraction are marked before they are visited
+PRUNABLE_TYPES = [
+    'network_groups',
+    'port_groups',
+    'url_groups',
+    'hosts',
+    'networks',
+    'ranges',
+    'ports',
+    'icmpv4s',
+    'urls'
+]
+
+# Member field of each group type
+GROUP_MEMBER_FIELDS = {
+    'network_groups': 'objects',
+    'port_groups': 'objects',
+    'url_groups': 'urls'
+}
+
+# Access rule fields holding object or policy names
+ACCESS_RULE_REFERENCE_FIELDS = [
+    'source_zones',
+    'destination_zones',
+    'source_network_objects',
+    'destination_network_objects',
+    'destination_port_objects',
+    'url_objects',
+    'intrusion_policy'
+]
+
+
+def access_rule_references(policies):
+    """Yield every name referenced by the access rules of the given policies"""
+    for policy in policies:
+        for rule in policy.get('access_rules', []):
+            for field in ACCESS_RULE_REFERENCE_FIELDS:
+                value = rule.get(field)
+                if isinstance(value, list):
+                    yield from value
+                elif value is not None:
+                    yield value
+
+
+def mark(roots, members, marked):
+    """
+    Add every name reachable from roots through group members to marked.
+    Each name is expanded once, so the walk is linear in the number of references.
+
+    Args:
+        roots: Iterable of referenced names
+        members: Dict of group name to member names
+        marked: Set of names already marked, updated in place
+    """
+    stack = [name for name in roots if name not in marked]
+    marked.update(stack)
+    while stack:
+        for member in members.get(stack.pop(), ()):
+            if member not in marked:
+                marked.add(member)
+                stack.append(member)
+
+
+def prune_objects(objects, policies, referenced_fraction=1.0):
+    """
+    Drop objects that are not reachable from any access rule.
+
+    With a referenced fraction below 1, only enough unreferenced objects are
+    dropped for that fraction of each type to be referenced. The members of
+    unreferenced groups kept this way count as referenced and are never dropped.
+
+    Args:
+        objects: Dict of object type to generated objects, pruned types are replaced in place
+        policies: Access control policies whose rules are the roots
+        referenced_fraction: Minimum fraction of referenced objects per type (0 < f <= 1)
+
+    Returns:
+        Dict of object type to (generated, pruned, referenced) counts
+    """
+    members = {}
+    for object_type, field in GROUP_MEMBER_FIELDS.items():
+        for group in objects.get(object_type, []):
+            members[group['name']] = group.get(field, [])
+
+    marked = set()
+    mark(access_rule_references(policies), members, marked)
+
+    report = {}
+    for object_type in PRUNABLE_TYPES:
+        items = objects.get(object_type)
+        if not items:
+            continue
+
+        referenced = sum(1 for item in items if item['name'] in marked)
+        # Largest number of unreferenced objects keeping referenced / total >= fraction
+        allowed = int(referenced * (1 - referenced_fraction) / referenced_fraction)
+
+        # Network groups nest earlier groups only, so walking backwards marks the
+        # members of a kept unreferenced group before they are visited
+        kept = []
+        for item in reversed(items):
+            if item['name'] in marked:
+                kept.append(item)
+            elif allowed > 0:
+                allowed -= 1
+                kept.append(item)
+                if object_type in GROUP_MEMBER_FIELDS:
+                    mark(members[item['name']], members, marked)
+        kept.reverse()
+
+        objects[object_type] = kept
+        report[object_type] = (len(items), len(items) - len(kept), referenced)
+
+    return report
@@ -0,0 +1,266 @@
+"""
+Workload profile utilities for skewed object reuse
+
+Profiles describe how generated objects reference each other: how often an
+object is reused, how many objects a rule field holds and how rules spread
+across categories. Weighted draws go through precomputed alias tables, so a
+skewed draw costs the same O(1) as a uniform one.
+"""
+
+import random
+from bisect import bisect_right
+from itertools import accumulate
+
+
+# Distributions accepted by the reuse, rule_size and category_skew settings
+DISTRIBUTIONS = ['uniform', 'zipf', 'power_law']
+
+
+def power_law_weights(count, exponent, offset=0.0):
+    """
+    Return Zipf/power-law weights for ranks 1..count.
+    Weight of rank r is 1 / (r + offset) ** exponent (Zipf-Mandelbrot when offset > 0).
+    """
+    return [1.0 / ((rank + offset) ** exponent) for rank in range(1, count + 1)]
+
+
+def distribution_weights(count, spec):
+    """
+    Return weights for ranks 1..count described by a distribution spec.
+
+    Args:
+        count: Number of ranks
+        spec: Dict with 'distribution' and, for zipf/power_law, 'exponent' and optional 'offset'
+    """
+    distribution = spec.get('distribution', 'uniform')
+    if distribution == 'uniform':
+        return [1.0] * count
+    return power_law_weights(count, spec.get('exponent', 1.0), spec.get('offset', 0.0))
+
+
+class AliasTable:
+    """
+    Vose alias table for drawing indexes 0..n-1 with arbitrary weights in O(1).
+
+    Args:
+        weights: Non-negative weights, one per index (at least one must be positive)
+    """
+
+    def __init__(self, weights):
+        count = len(weights)
+        total = float(sum(weights))
+        if count == 0 or total <= 0:
+            raise ValueError("AliasTable needs at least one positive weight")
+
+        scaled = [w * count / total for w in weights]
+        self.probability = [1.0] * count
+        self.alias = list(range(count))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] = (scaled[more] + scaled[less]) - 1.0
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+
+        # Leftovers are 1.0 up to floating point error
+        for i in small + large:
+            self.probability[i] = 1.0
+
+        self.size = count
+
+    def draw(self):
+        """Draw one index"""
+        i = int(random.random() * self.size)
+        if random.random() < self.probability[i]:
+            return i
+        return self.alias[i]
+
+
+class ReferenceSampler:
+    """
+    Draw distinct object names with skewed (hot/cold) popularity.
+
+    Popularity ranks are assigned to the population in random order, so hot
+    objects are spread over all object types instead of the first generated ones.
+
+    Names are grouped into blocks of BLOCK_SIZE in population order, each with
+    its own alias table, so a draw limited to the first names only ever sees
+    names that exist: a fully unlocked block is picked by its weight (binary
+    search over the block totals) and drawn from in O(1), the partly unlocked
+    block is drawn from by binary search over its prefix sums. Tables are built
+    as blocks unlock, so the total build cost stays linear. Draws over the whole
+    population use a single alias table.
+
+    Args:
+        population: Object names that can be referenced
+        weights: Positive popularity weight for each rank, highest first
+    """
+
+    # Names per block
+    BLOCK_SIZE = 256
+
+    # Draws without a new distinct name before falling back to uniform picks
+    MAX_REJECTIONS = 64
+
+    def __init__(self, population, weights):
+        self.population = list(population)
+        ranks = list(range(len(self.population)))
+        random.shuffle(ranks)
+        self.weights = [weights[rank] for rank in ranks]
+        self._table = None
+        self._tables = []
+        self._prefix_sums = []
+        # Running weight total at the end of every block
+        self._block_totals = []
+
+    def _unlock(self, blocks):
+        """Build the tables of the first `blocks` blocks"""
+        size = self.BLOCK_SIZE
+        for block in range(len(self._tables), blocks):
+            weights = self.weights[block * size:(block + 1) * size]
+            self._tables.append(AliasTable(weights))
+            self._prefix_sums.append(list(accumulate(weights)))
+            previous = self._block_totals[-1] if self._block_totals else 0.0
+            self._block_totals.append(previous + self._prefix_sums[-1][-1])
+
+    def _limited_draw(self, limit):
+        """Return a function drawing one index below limit from the block tables"""
+        size = self.BLOCK_SIZE
+        full, partial = divmod(limit, size)
+        self._unlock(full + (1 if partial else 0))
+        tables = self._tables
+        block_totals = self._block_totals
+        partial_sums = self._prefix_sums[full] if partial else None
+        full_weight = block_totals[full - 1] if full else 0.0
+        total = full_weight + (partial_sums[partial - 1] if partial else 0.0)
+        rand = random.random
+
+        def draw():
+            point = rand() * total
+            if point < full_weight:
+                block = bisect_right(block_totals, point, 0, full)
+                return block * size + tables[block].draw()
+            # Rounding may put the point at the very end of the partial names
+            return full * size + min(bisect_right(partial_sums, point - full_weight, 0, partial), partial - 1)
+
+        return draw
+
+    def sample(self, k, limit=None):
+        """
+        Draw k distinct names from the first `limit` names of the population.
+
+        Args:
+            k: Number of names to draw
+            limit: Only names with index < limit are eligible (defaults to the whole population)
+        """
+        if limit is None or limit >= len(self.population):
+            limit = len(self.population)
+            # Every name exists, one table over the whole population draws in O(1)
+            if self._table is None:
+                self._table = AliasTable(self.weights)
+            draw = self._table.draw
+        else:
+            draw = self._limited_draw(limit)
+        k = min(k, limit)
+
+        selected = []
+        seen = set()
+        rejections = 0
+        while len(selected) < k and rejections <= self.MAX_REJECTIONS:
+            index = draw()
+            if index in seen:
+                rejections += 1
+                continue
+            seen.add(index)
+            selected.append(self.population[index])
+
+        # Very hot heads can starve the loop, the rest is picked uniformly
+        while len(selected) < k:
+            index = random.randrange(limit)
+            if index not in seen:
+                seen.add(index)
+                selected.append(self.population[index])
+
+        return selected
+
+    def choice(self):
+        """Draw a single name"""
+        return self.sample(1)[0]
+
+
+class WorkloadProfile:
+    """
+    Named workload profile loaded from the profiles section of cfg.yaml.
+
+    Args:
+        name: Profile name
+        spec: Profile settings (reuse, rule_size, category_skew)
+    """
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.reuse = spec.get('reuse') or {}
+        self.rule_size = spec.get('rule_size') or {}
+        self.category_skew = spec.get('category_skew') or {}
+        self._size_tables = {}
+
+    def reference_sampler(self, population, extra=()):
+        """
+        Return a ReferenceSampler over population + extra, or None for uniform reuse.
+        Names in extra are generated later and unlocked with the sampler's limit argument.
+        """
+        if self.reuse.get('distribution', 'uniform') == 'uniform':
+            return None
+        names = list(population) + list(extra)
+        if not names:
+            return None
+        return ReferenceSampler(names, distribution_weights(len(names), self.reuse))
+
+    def draw_rule_size(self, default_max, available):
+        """
+        Draw how many objects a rule field references.
+
+        Args:
+            default_max: Field maximum used when the profile does not set rule_size.max
+            available: Number of objects that can be referenced
+        """
+        maximum = min(self.rule_size.get('max', default_max), available)
+        minimum = min(self.rule_size.get('min', 1), maximum)
+        if self.rule_size.get('distribution', 'uniform') == 'uniform':
+            return random.randint(minimum, maximum)
+
+        key = (minimum, maximum)
+        table = self._size_tables.get(key)
+        if table is None:
+            table = AliasTable(distribution_weights(maximum - minimum + 1, self.rule_size))
+            self._size_tables[key] = table
+        return minimum + table.draw()
+
+    def category_rule_counts(self, rules_number, categories_number):
+        """
+        Return the number of rules per category, or None for the default even layout.
+        Heavier categories are placed at random positions; counts always sum to rules_number.
+        """
+        if categories_number == 0 or self.category_skew.get('distribution', 'uniform') == 'uniform':
+            return None
+
+        weights = distribution_weights(categories_number, self.category_skew)
+        random.shuffle(weights)
+        total = sum(weights)
+
+        # Largest remainder method keeps the total exact
+        quotas = [rules_number * w / total for w in weights]
+        counts = [int(q) for q in quotas]
+        leftover = rules_number - sum(counts)
+        by_remainder = sorted(range(categories_number), key=lambda i: quotas[i] - counts[i], reverse=True)
+        for i in by_remainder[:leftover]:
+            counts[i] += 1
+        return counts
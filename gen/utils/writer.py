@@ -0,0 +1,118 @@
+"""
+Background writer pipeline for YAML generation
+
+YAML serialization holds the GIL for its whole duration (the representer is
+Python even with the libyaml emitter), so writer threads cannot overlap it with
+generation. Outputs are therefore pickled on the main thread, which is fast, and
+serialized and written by worker processes while the next stage generates.
+"""
+
+import os
+import pickle
+import threading
+import yaml
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from utils.file_ops import Dumper, get_data_path
+
+
+# Buffer size used for output files, large enough to turn a dump into a few big writes
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+def _write(data, output_path):
+    """Serialize data and write it to disk"""
+    # The large buffer turns the emitter's many small writes into a few big ones
+    with open(output_path, 'w', buffering=WRITE_BUFFER_SIZE) as f:
+        yaml.dump(data, f, Dumper=Dumper, default_flow_style=False, sort_keys=False)
+        f.flush()
+        os.fsync(f.fileno())
+
+    # Single write so the line does not interleave with output of other processes
+    print(f"Generated {output_path.name}\n", end='', flush=True)
+
+
+def _write_pickled(payload, output_path):
+    """Write a pickled output (runs in a writer process)"""
+    _write(pickle.loads(payload), output_path)
+
+
+class OutputWriter:
+    """
+    Write generated data to YAML files in the data folder on background processes.
+
+    submit() pickles the data and hands it to a writer process. Pickled outputs
+    waiting for a writer are bounded by queue_bytes: submit() blocks while more
+    are pending (backpressure). The bound counts pickled payloads, so it limits
+    what the writer holds on top of the generated data; an output larger than
+    queue_bytes is still accepted once nothing else is pending, and the caller
+    holds every output whole while generating it. close() is the barrier: it
+    waits for every queued output to be written and fsynced and re-raises the
+    first writer error. A writer error is also raised by the next submit(), so
+    generation stops early.
+
+    Args:
+        processes: Number of writer processes (0 writes synchronously in submit)
+        queue_bytes: Maximum size of pickled outputs waiting to be written
+        output_dir: Folder to write into (defaults to the data folder)
+    """
+
+    def __init__(self, processes=2, queue_bytes=256 * 1024 * 1024, output_dir=None):
+        if output_dir is None:
+            output_dir = get_data_path()
+        self.output_dir = Path(output_dir)
+        self.queue_bytes = max(1, queue_bytes)
+        # Without writer processes outputs are written synchronously by submit()
+        self._executor = ProcessPoolExecutor(max_workers=processes) if processes > 0 else None
+        self._pending = 0
+        self._errors = []
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def submit(self, data, filename):
+        """Queue data for writing, blocking while too many bytes are pending"""
+        if self._closed:
+            raise RuntimeError("OutputWriter is closed")
+        self._raise_error()
+        if self._executor is None:
+            _write(data, self.output_dir / filename)
+            return
+        payload = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+        size = len(payload)
+        with self._condition:
+            # A single output larger than the bound still passes once the queue is empty
+            self._condition.wait_for(lambda: self._pending == 0 or self._pending + size <= self.queue_bytes)
+            self._pending += size
+        future = self._executor.submit(_write_pickled, payload, self.output_dir / filename)
+        future.add_done_callback(lambda done: self._finished(done, filename, size))
+
+    def close(self):
+        """Wait until all queued outputs are written and synced to disk"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self._raise_error()
+
+    def _finished(self, future, filename, size):
+        with self._condition:
+            self._pending -= size
+            if future.exception() is not None:
+                self._errors.append((filename, future.exception()))
+            self._condition.notify_all()
+
+    def _raise_error(self):
+        """Re-raise the first writer error, if any"""
+        with self._condition:
+            if not self._errors:
+                return
+            filename, error = self._errors[0]
+        raise RuntimeError(f"Failed to write {filename}: {error}") from error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+FMC Data Validator
+Checks generated files against the nac-fmc constraints encoded by the generators
+(ICMP type/code pairs, port ranges, intrusion policy and logging rules of access
+rules, category ordering) without running Terraform
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from utils.file_ops import get_data_path
+from analysis.validation import CHUNK_BYTES, validate_files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate generated nac-fmc data files")
+    parser.add_argument('files', nargs='*', help="Files to validate (default: data/*.nac.yaml)")
+    parser.add_argument('--workers', type=int, default=None, help="Validation processes (default: CPU count)")
+    parser.add_argument('--chunk-mb', type=float, default=CHUNK_BYTES / 1024 / 1024,
+                        help="Size of the access rule chunks large files are split into (0 disables splitting)")
+    parser.add_argument('--show', type=int, default=50, help="Number of violations to list")
+    args = parser.parse_args()
+
+    print("FMC Data Validator")
+    print("=" * 50)
+
+    paths = [Path(name) for name in args.files] or sorted(get_data_path().glob('*.nac.yaml'))
+    missing = [str(path) for path in paths if not path.is_file()]
+    if missing:
+        print(f"Error: files not found: {', '.join(missing)}", file=sys.stderr)
+        sys.exit(1)
+    if not paths:
+        print("Error: no files to validate", file=sys.stderr)
+        sys.exit(1)
+
+    started = time.perf_counter()
+    records = 0
+    violations = []
+    try:
+        results = sorted(validate_files(paths, args.workers, int(args.chunk_mb * 1024 * 1024)),
+                         key=lambda result: result[0])
+    except Exception as e:
+        print(f"Error: validation failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    seconds = time.perf_counter() - started
+
+    # Violations are listed per file in file order
+    for name, count, found in results:
+        records += count
+        violations.extend((name, path, message) for path, message in found)
+
+    for name, path, message in violations[:args.show]:
+        print(f"{name}: {path}: {message}")
+    if len(violations) > args.show:
+        print(f"... {len(violations) - args.show} more")
+
+    print(f"Validated {records} records in {len(paths)} files in {seconds:.3f}s ({records / seconds:,.0f} records/s)")
+    print("=" * 50)
+    if violations:
+        print(f"Found {len(violations)} violations", file=sys.stderr)
+        sys.exit(1)
+    print("Validation completed successfully!")
+
+
+if __name__ == '__main__':
+    main()